@@ -50,6 +50,42 @@ app.conf.update(
             'task': 'apps.availability.tasks.monitor_cache_performance_detailed',
             'schedule': 3600.0,  # Run every hour
         },
+        'reconcile-contact-group-member-counts': {
+            'task': 'apps.contacts.tasks.reconcile_group_member_counts',
+            'schedule': 86400.0,  # Run daily
+        },
+        'process-dirty-contact-stats': {
+            'task': 'apps.contacts.tasks.process_dirty_contact_stats',
+            'schedule': 60.0,  # Run every minute
+        },
+        'flush-contact-interaction-buffer': {
+            'task': 'apps.contacts.tasks.flush_interaction_buffer',
+            'schedule': 10.0,  # Run every 10 seconds
+        },
+        'archive-old-contact-interactions': {
+            'task': 'apps.contacts.tasks.archive_old_interactions',
+            'schedule': 86400.0,  # Run daily
+        },
+        'maintain-contact-interaction-partitions': {
+            'task': 'apps.contacts.tasks.maintain_interaction_partitions',
+            'schedule': 86400.0,  # Run daily
+        },
+        'rebuild-contact-group-bitmaps': {
+            'task': 'apps.contacts.tasks.rebuild_group_bitmaps',
+            'schedule': 86400.0,  # Run daily
+        },
+        'backfill-contact-search-vectors': {
+            'task': 'apps.contacts.tasks.backfill_contact_search_vectors',
+            'schedule': 3600.0,  # Run every hour
+        },
+        'refresh-smart-contact-groups': {
+            'task': 'apps.contacts.tasks.refresh_smart_groups',
+            'schedule': 86400.0,  # Run daily
+        },
+        'cleanup-contact-exports': {
+            'task': 'apps.contacts.tasks.cleanup_contact_exports',
+            'schedule': 3600.0,  # Run every hour
+        },
         'sync-all-calendar-integrations': {
             'task': 'apps.integrations.tasks.sync_all_calendar_integrations',
             'schedule': 900.0,  # Run every 15 minutes
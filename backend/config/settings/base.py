@@ -25,6 +25,7 @@ DJANGO_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -286,6 +287,35 @@ AVAILABILITY_REASONABLE_HOURS_END = config('AVAILABILITY_REASONABLE_HOURS_END',
 AVAILABILITY_SLOT_INTERVAL_MINUTES = config('AVAILABILITY_SLOT_INTERVAL_MINUTES', default=15, cast=int)
 AVAILABILITY_CACHE_DEBOUNCE_SECONDS = config('AVAILABILITY_CACHE_DEBOUNCE_SECONDS', default=300, cast=int)  # 5 minutes
 
+# Contacts Module Settings
+CONTACTS_SUGGEST_DEFAULT_LIMIT = config('CONTACTS_SUGGEST_DEFAULT_LIMIT', default=10, cast=int)
+CONTACTS_SUGGEST_MAX_LIMIT = config('CONTACTS_SUGGEST_MAX_LIMIT', default=25, cast=int)
+CONTACTS_APPROXIMATE_COUNT_THRESHOLD = config('CONTACTS_APPROXIMATE_COUNT_THRESHOLD', default=10000, cast=int)
+CONTACTS_COUNT_CACHE_TIMEOUT = config('CONTACTS_COUNT_CACHE_TIMEOUT', default=60, cast=int)  # 1 minute
+CONTACTS_TAG_FACETS_CACHE_TIMEOUT = config('CONTACTS_TAG_FACETS_CACHE_TIMEOUT', default=3600, cast=int)  # 1 hour
+CONTACTS_RESPONSE_CACHE_TIMEOUT = config('CONTACTS_RESPONSE_CACHE_TIMEOUT', default=300, cast=int)  # 5 minutes
+CONTACTS_BULK_MEMBERSHIP_MAX_IDS = config('CONTACTS_BULK_MEMBERSHIP_MAX_IDS', default=50000, cast=int)
+CONTACTS_BULK_BATCH_SIZE = config('CONTACTS_BULK_BATCH_SIZE', default=1000, cast=int)
+CONTACTS_INTERACTION_PARTITIONS_AHEAD = config('CONTACTS_INTERACTION_PARTITIONS_AHEAD', default=3, cast=int)  # months
+CONTACTS_INTERACTION_RETENTION_MONTHS = config('CONTACTS_INTERACTION_RETENTION_MONTHS', default=0, cast=int)  # 0 = keep forever
+CONTACTS_INTERACTION_WRITE_BUFFER = config('CONTACTS_INTERACTION_WRITE_BUFFER', default=False, cast=bool)
+CONTACTS_INTERACTION_BUFFER_URL = config('CONTACTS_INTERACTION_BUFFER_URL', default=config('REDIS_URL', default='redis://127.0.0.1:6379/1'))
+CONTACTS_INTERACTION_FLUSH_THRESHOLD = config('CONTACTS_INTERACTION_FLUSH_THRESHOLD', default=500, cast=int)
+CONTACTS_INTERACTION_FLUSH_BATCH_SIZE = config('CONTACTS_INTERACTION_FLUSH_BATCH_SIZE', default=1000, cast=int)
+CONTACTS_INTERACTION_IDEMPOTENCY_TIMEOUT = config('CONTACTS_INTERACTION_IDEMPOTENCY_TIMEOUT', default=86400, cast=int)  # 1 day
+CONTACTS_INTERACTION_ARCHIVE_AFTER_DAYS = config('CONTACTS_INTERACTION_ARCHIVE_AFTER_DAYS', default=365, cast=int)  # 0 disables
+CONTACTS_INTERACTION_ARCHIVE_PATH = config('CONTACTS_INTERACTION_ARCHIVE_PATH', default='contact_interaction_archive')
+CONTACTS_PRIVATE_STORAGE_ROOT = config('CONTACTS_PRIVATE_STORAGE_ROOT', default=str(BASE_DIR / 'private'))  # never served
+CONTACTS_STATS_DEBOUNCE_SECONDS = config('CONTACTS_STATS_DEBOUNCE_SECONDS', default=300, cast=int)  # 5 minutes
+CONTACTS_TRENDS_BUCKET_CACHE_TIMEOUT = config('CONTACTS_TRENDS_BUCKET_CACHE_TIMEOUT', default=2592000, cast=int)  # 30 days
+CONTACTS_TAG_FACETS_STALE_TIMEOUT = config('CONTACTS_TAG_FACETS_STALE_TIMEOUT', default=86400, cast=int)  # 1 day
+CONTACTS_EXPORT_CACHE_TIMEOUT = config('CONTACTS_EXPORT_CACHE_TIMEOUT', default=300, cast=int)  # 5 minutes
+CONTACTS_EXPORT_PATH = config('CONTACTS_EXPORT_PATH', default='contact_exports')
+CONTACTS_EXPORT_RETENTION_SECONDS = config('CONTACTS_EXPORT_RETENTION_SECONDS', default=3600, cast=int)  # must exceed CONTACTS_EXPORT_CACHE_TIMEOUT
+CONTACTS_SINGLE_FLIGHT_LOCK_TIMEOUT = config('CONTACTS_SINGLE_FLIGHT_LOCK_TIMEOUT', default=60, cast=int)
+CONTACTS_SINGLE_FLIGHT_WAIT_TIMEOUT = config('CONTACTS_SINGLE_FLIGHT_WAIT_TIMEOUT', default=10, cast=int)
+CONTACTS_IMPORT_SPOOL_PATH = config('CONTACTS_IMPORT_SPOOL_PATH', default='contact_imports')
+
 # Twilio Configuration (for SMS)
 TWILIO_ACCOUNT_SID = config('TWILIO_ACCOUNT_SID', default='')
 TWILIO_AUTH_TOKEN = config('TWILIO_AUTH_TOKEN', default='')
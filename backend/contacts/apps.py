@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ContactsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.contacts'
-    verbose_name = 'Contacts'
\ No newline at end of file
+    verbose_name = 'Contacts'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
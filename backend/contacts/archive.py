@@ -0,0 +1,253 @@
+"""
+Cold archival of old contact interactions.
+
+``archive_month`` moves one organizer's interactions for one UTC month into a
+gzipped JSONL segment in ``private_storage`` (never the public media tree),
+records an ``InteractionArchiveSegment`` and deletes the rows from the
+database. Each line is the ``ContactInteractionSerializer`` representation, so
+archived rows render exactly like live ones. Rows are serialized, merged with
+the previous segment and deleted a batch at a time, so a month is never held
+in memory.
+
+Live interactions cascade with their contact, but segments are not rewritten
+on every delete. Instead, reads skip archived rows whose contact no longer
+exists, and such rows are dropped for good when their month is archived again.
+Merging contacts is the exception: ``reassign_archived_contacts`` rewrites
+the affected segments before the duplicates are deleted, so their archived
+history moves to the primary contact just like their live interactions.
+
+Segments are written under a new name and recorded before rows are deleted,
+and merged by id when a month is archived again, so an interrupted run can
+simply be retried.
+"""
+import gzip
+import heapq
+import json
+import tempfile
+from itertools import islice
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.files import File
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Contact, ContactInteraction, InteractionArchiveSegment
+from .partitions import add_months, month_start
+from .serializers import ContactInteractionSerializer
+from .storage import private_storage
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def get_segment_path(organizer_id, month):
+    return f"{settings.CONTACTS_INTERACTION_ARCHIVE_PATH}/{organizer_id}/{month:%Y-%m}.jsonl.gz"
+
+
+def interaction_sort_key(created_at, interaction_id):
+    """Sort key matching the live list ordering, ``(-created_at, id)``."""
+    if isinstance(created_at, str):
+        created_at = parse_datetime(created_at)
+    return (-((created_at - EPOCH) // timedelta(microseconds=1)), str(interaction_id))
+
+
+def row_sort_key(row):
+    return interaction_sort_key(row['created_at'], row['id'])
+
+
+LIVE_CONTACT_CHECK_BATCH_SIZE = 200
+
+
+def iter_segment(segment):
+    """Stream a segment's archived rows, newest first, decompressing only as far as they're consumed."""
+    with private_storage.open(segment.path, 'rb') as handle:
+        with gzip.open(handle, 'rt', encoding='utf-8') as lines:
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_segment(segment):
+    """All archived rows of a segment, newest first."""
+    return list(iter_segment(segment))
+
+
+def iter_live_contact_rows(rows, organizer_id):
+    """Drop rows whose contact has been deleted, checking contacts a batch at a time."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, LIVE_CONTACT_CHECK_BATCH_SIZE))
+        if not batch:
+            return
+        live = {
+            str(contact_id) for contact_id in Contact.objects.filter(
+                organizer_id=organizer_id, id__in={row['contact_id'] for row in batch}
+            ).values_list('id', flat=True)
+        }
+        for row in batch:
+            if row['contact_id'] in live:
+                yield row
+
+
+def iter_month_rows(interactions):
+    """Serialize interactions newest first, a batch at a time."""
+    batch_size = settings.CONTACTS_BULK_BATCH_SIZE
+    interactions = interactions.order_by('-created_at', 'id').iterator(chunk_size=batch_size)
+    while True:
+        batch = list(islice(interactions, batch_size))
+        if not batch:
+            return
+        yield from ContactInteractionSerializer(batch, many=True).data
+
+
+def merge_rows(live_rows, previous_rows):
+    """Merge two newest-first row streams, keeping the live copy of a row found in both."""
+    last_id = None
+    # heapq.merge is stable, so on equal keys the live row comes first
+    for row in heapq.merge(live_rows, previous_rows, key=row_sort_key):
+        if row['id'] != last_id:
+            yield row
+        last_id = row['id']
+
+
+def write_segment(path, rows):
+    """Stream rows into a new segment file; returns ``(stored path, row count)``."""
+    row_count = 0
+    with tempfile.TemporaryFile() as spool:
+        with gzip.GzipFile(fileobj=spool, mode='wb') as compressed:
+            for row in rows:
+                compressed.write(json.dumps(row, separators=(',', ':')).encode('utf-8') + b'\n')
+                row_count += 1
+        spool.seek(0)
+        # Saved under a new name if the segment exists, so it stays readable until replaced
+        return private_storage.save(path, File(spool)), row_count
+
+
+def archive_month(organizer_id, month):
+    """Archive an organizer's interactions in the UTC month starting at ``month``; returns rows moved."""
+    month = month_start(month)
+    interactions = ContactInteraction.objects.filter(
+        organizer_id=organizer_id,
+        created_at__gte=month,
+        created_at__lt=add_months(month, 1)
+    )
+    if not interactions.exists():
+        return 0
+    
+    segment = InteractionArchiveSegment.objects.filter(organizer_id=organizer_id, month=month.date()).first()
+    previous = iter_live_contact_rows(iter_segment(segment), organizer_id) if segment else []
+    path, row_count = write_segment(
+        get_segment_path(organizer_id, month),
+        merge_rows(iter_month_rows(interactions.select_related('contact', 'booking')), previous)
+    )
+    
+    previous_path = segment.path if segment else None
+    segment, _ = InteractionArchiveSegment.objects.update_or_create(
+        organizer_id=organizer_id,
+        month=month.date(),
+        defaults={'path': path, 'row_count': row_count}
+    )
+    if previous_path and previous_path != path:
+        private_storage.delete(previous_path)
+    
+    # Delete exactly the rows now in the segment, a batch of ids at a time.
+    # Plain DELETEs without loading rows or sending per-row signals; the
+    # rollups intentionally keep counting archived interactions
+    moved = 0
+    archived_ids = (row['id'] for row in iter_segment(segment))
+    while True:
+        batch = list(islice(archived_ids, settings.CONTACTS_BULK_BATCH_SIZE))
+        if not batch:
+            return moved
+        moved += interactions.filter(id__in=batch)._raw_delete(interactions.db)
+
+
+def reassign_archived_contacts(organizer_id, contact_ids, target):
+    """
+    Point archived rows of ``contact_ids`` at the ``target`` contact; returns segments rewritten.
+    
+    Must run before those contacts are deleted, since rows of deleted
+    contacts are skipped on read and dropped when their month is re-archived.
+    """
+    contact_ids = {str(contact_id) for contact_id in contact_ids}
+    
+    def reassigned_rows(segment):
+        for row in iter_segment(segment):
+            if row['contact_id'] in contact_ids:
+                row = {**row, 'contact_id': str(target.id), 'contact_name': target.full_name}
+            yield row
+    
+    rewritten = 0
+    for segment in InteractionArchiveSegment.objects.filter(organizer_id=organizer_id).iterator():
+        if not any(row['contact_id'] in contact_ids for row in iter_segment(segment)):
+            continue
+        path, _ = write_segment(get_segment_path(organizer_id, segment.month), reassigned_rows(segment))
+        InteractionArchiveSegment.objects.filter(pk=segment.pk).update(path=path)
+        private_storage.delete(segment.path)
+        rewritten += 1
+    return rewritten
+
+
+def get_archivable_months(cutoff):
+    """``(organizer_id, month)`` pairs with interactions in months entirely before ``cutoff``."""
+    return (
+        ContactInteraction.objects
+        .filter(created_at__lt=month_start(cutoff))
+        .annotate(month=TruncMonth('created_at', tzinfo=dt_timezone.utc))
+        .values_list('organizer_id', 'month')
+        .distinct()
+        .order_by('organizer_id', 'month')
+    )
+
+
+def get_archive_cutoff():
+    return timezone.now() - timedelta(days=settings.CONTACTS_INTERACTION_ARCHIVE_AFTER_DAYS)
+
+
+def iter_archived_rows(organizer_id, descending=True, boundary=None, contact_id=None, interaction_types=None,
+                       since=None, until=None):
+    """
+    Yield archived rows matching the interaction list filters, in list order.
+    
+    ``descending`` is the live ordering (newest first); otherwise rows come
+    oldest first. Segments outside ``since``/``until``, and segments entirely
+    on the far side of a cursor's ``boundary`` time, are never read, and
+    descending reads stop decompressing once the caller stops consuming.
+    Rows of deleted contacts are skipped.
+    """
+    segments = InteractionArchiveSegment.objects.filter(organizer_id=organizer_id)
+    if boundary:
+        boundary_month = month_start(boundary).date()
+        if descending:
+            segments = segments.filter(month__lte=boundary_month)
+        else:
+            segments = segments.filter(month__gte=boundary_month)
+    if since:
+        segments = segments.filter(month__gte=month_start(since).date())
+    if until:
+        segments = segments.filter(month__lte=until.date())
+    segments = segments.order_by('-month' if descending else 'month')
+    
+    contact_id = str(contact_id) if contact_id else None
+    rows = _iter_matching_rows(segments, descending, contact_id, interaction_types, since, until)
+    if contact_id:
+        # One contact's timeline: a single existence check covers every row
+        if Contact.objects.filter(organizer_id=organizer_id, id=contact_id).exists():
+            yield from rows
+        return
+    yield from iter_live_contact_rows(rows, organizer_id)
+
+
+def _iter_matching_rows(segments, descending, contact_id, interaction_types, since, until):
+    for segment in segments.iterator():
+        # Segments are stored newest first; only oldest-first reads need the whole segment
+        rows = iter_segment(segment) if descending else reversed(read_segment(segment))
+        for row in rows:
+            if contact_id and row['contact_id'] != contact_id:
+                continue
+            if interaction_types and row['interaction_type'] not in interaction_types:
+                continue
+            if since or until:
+                created_at = parse_datetime(row['created_at'])
+                if (since and created_at < since) or (until and created_at >= until):
+                    continue
+            yield row
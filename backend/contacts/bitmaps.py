@@ -0,0 +1,184 @@
+"""
+Bitmap-backed group membership index.
+
+Each contact gets a compact per-organizer ``index_id``; each group keeps a
+zlib-compressed bitset of its members' index ids (``ContactGroupBitmap``).
+Audience queries like "in A and B but not C" and overlap counts then run as
+integer bit operations instead of pulling id lists out of the database.
+
+The bitset is a plain Python ``int`` (bit ``n`` set means ``index_id`` ``n`` is a
+member), which supports ``&``, ``|`` and ``& ~`` natively and compresses well.
+"""
+import zlib
+from django.db import transaction
+from .models import Contact, ContactGroup, ContactGroupBitmap, ContactIndexSequence
+
+
+class MembershipBitmap:
+    __slots__ = ('bits',)
+    
+    def __init__(self, bits=0):
+        self.bits = bits
+    
+    @classmethod
+    def from_ids(cls, index_ids):
+        bitmap = cls()
+        bitmap.add(index_ids)
+        return bitmap
+    
+    @classmethod
+    def from_bytes(cls, data):
+        if not data:
+            return cls()
+        return cls(int.from_bytes(zlib.decompress(bytes(data)), 'little'))
+    
+    def _to_raw(self, min_size=0):
+        size = max((self.bits.bit_length() + 7) // 8, min_size)
+        return bytearray(self.bits.to_bytes(size, 'little'))
+    
+    def to_bytes(self):
+        if not self.bits:
+            return b''
+        return zlib.compress(bytes(self._to_raw()))
+    
+    def add(self, index_ids):
+        # Bulk bit twiddling goes through a bytearray: O(size + n) rather than
+        # O(size * n) for repeated big-int operations
+        index_ids = list(index_ids)
+        if not index_ids:
+            return
+        raw = self._to_raw(max(index_ids) // 8 + 1)
+        for index_id in index_ids:
+            raw[index_id >> 3] |= 1 << (index_id & 7)
+        self.bits = int.from_bytes(raw, 'little')
+    
+    def discard(self, index_ids):
+        raw = self._to_raw()
+        for index_id in index_ids:
+            if (index_id >> 3) < len(raw):
+                raw[index_id >> 3] &= ~(1 << (index_id & 7)) & 0xFF
+        self.bits = int.from_bytes(raw, 'little')
+    
+    def __and__(self, other):
+        return MembershipBitmap(self.bits & other.bits)
+    
+    def __or__(self, other):
+        return MembershipBitmap(self.bits | other.bits)
+    
+    def __sub__(self, other):
+        return MembershipBitmap(self.bits & ~other.bits)
+    
+    def count(self):
+        return bin(self.bits).count('1')
+    
+    def __iter__(self):
+        for byte_index, byte in enumerate(self._to_raw()):
+            while byte:
+                lowest = byte & -byte
+                yield (byte_index << 3) + lowest.bit_length() - 1
+                byte ^= lowest
+
+
+def allocate_index_ids(organizer_id, count=1):
+    """Reserve ``count`` consecutive index ids for an organizer."""
+    with transaction.atomic():
+        sequence, _ = ContactIndexSequence.objects.select_for_update().get_or_create(organizer_id=organizer_id)
+        start = sequence.next_id
+        sequence.next_id = start + count
+        sequence.save(update_fields=['next_id'])
+    return range(start, start + count)
+
+
+def assign_missing_index_ids(organizer_id):
+    """Backfill ``index_id`` for an organizer's contacts that don't have one."""
+    contact_ids = list(
+        Contact.objects.filter(organizer_id=organizer_id, index_id__isnull=True).values_list('id', flat=True)
+    )
+    if not contact_ids:
+        return 0
+    
+    contacts = [
+        Contact(id=contact_id, index_id=index_id)
+        for contact_id, index_id in zip(contact_ids, allocate_index_ids(organizer_id, len(contact_ids)))
+    ]
+    Contact.objects.bulk_update(contacts, ['index_id'], batch_size=1000)
+    return len(contacts)
+
+
+def get_member_index_ids(group_id):
+    return Contact.objects.filter(groups__id=group_id, index_id__isnull=False).values_list('index_id', flat=True)
+
+
+def rebuild_group_bitmap(group_id):
+    """Recompute a group's bitmap from the membership table in one query."""
+    bitmap = MembershipBitmap.from_ids(get_member_index_ids(group_id).iterator())
+    ContactGroupBitmap.objects.update_or_create(group_id=group_id, defaults={'data': bitmap.to_bytes()})
+    return bitmap
+
+
+def update_group_bitmaps(group_ids, add=(), remove=()):
+    """Apply membership deltas (as index ids) to the given groups' bitmaps."""
+    if not group_ids or (not add and not remove):
+        return
+    
+    with transaction.atomic():
+        existing = {
+            row.group_id: row
+            for row in ContactGroupBitmap.objects.select_for_update().filter(group_id__in=group_ids)
+        }
+        for group_id in group_ids:
+            row = existing.get(group_id)
+            if row is None:
+                # No bitmap yet: build it from the table, which already has the change
+                rebuild_group_bitmap(group_id)
+                continue
+            
+            bitmap = MembershipBitmap.from_bytes(row.data)
+            bitmap.add(add)
+            bitmap.discard(remove)
+            row.data = bitmap.to_bytes()
+            row.save(update_fields=['data', 'updated_at'])
+
+
+def get_contact_index_ids(contact_ids):
+    return list(
+        Contact.objects.filter(id__in=contact_ids, index_id__isnull=False).values_list('index_id', flat=True)
+    )
+
+
+def load_group_bitmaps(organizer_id, group_ids):
+    """
+    Load bitmaps for an organizer's groups, keyed by group id.
+    
+    Groups without a stored bitmap are rebuilt; unknown or foreign groups are
+    left out of the result.
+    """
+    owned_ids = set(
+        ContactGroup.objects.filter(organizer_id=organizer_id, id__in=group_ids).values_list('id', flat=True)
+    )
+    bitmaps = {
+        row.group_id: MembershipBitmap.from_bytes(row.data)
+        for row in ContactGroupBitmap.objects.filter(group_id__in=owned_ids)
+    }
+    for group_id in owned_ids - set(bitmaps):
+        bitmaps[group_id] = rebuild_group_bitmap(group_id)
+    return bitmaps
+
+
+def evaluate_group_expression(bitmaps, all_of=(), any_of=(), none_of=()):
+    """(intersection of ``all_of``) & (union of ``any_of``) minus (union of ``none_of``)."""
+    result = None
+    for group_id in all_of:
+        result = bitmaps[group_id] if result is None else result & bitmaps[group_id]
+    
+    if any_of:
+        union = MembershipBitmap()
+        for group_id in any_of:
+            union = union | bitmaps[group_id]
+        result = union if result is None else result & union
+    
+    if result is None:
+        result = MembershipBitmap()
+    for group_id in none_of:
+        result = result - bitmaps[group_id]
+    return result
@@ -0,0 +1,314 @@
+"""
+Write-behind buffer for contact interactions.
+
+With ``CONTACTS_INTERACTION_WRITE_BUFFER`` enabled, interactions are appended
+to a Redis list instead of being inserted one row per transaction. The
+``flush_interaction_buffer`` task drains the list with ``bulk_create``; it runs
+periodically and is also queued as soon as the buffer reaches
+``CONTACTS_INTERACTION_FLUSH_THRESHOLD`` entries.
+
+Delivery is at-least-once: each batch is moved atomically from the buffer
+to a processing list and only removed from there once its insert commits,
+so a crashed or overrunning flush leaves it to be retried rather than lost. Each entry carries an
+idempotency key, and entries whose key is already stored are skipped. When a
+batch fails to insert, its entries are retried one at a time and those that
+still fail are moved to a dead-letter list, so one bad entry can't stall the
+buffer for every organizer.
+
+Callers can pass their own ``idempotency_key`` (a client's ``Idempotency-Key``
+header, or ``booking:<id>:booking_created``) so that a retried write records
+the interaction once per organizer. The key is claimed in the cache before
+the write, so a repeat returns the interaction already recorded or still
+buffered, and is looked up in the database once the claim has expired. The
+claim is a short lease until the write succeeds and is dropped if it fails,
+so a failed or interrupted write doesn't block retries.
+Writes with a natural timestamp (the booking's ``created_at``) also pass it
+as ``created_at``, which makes the unique ``(idempotency_key, created_at)``
+constraint a database-level backstop.
+"""
+import json
+from collections import Counter
+import logging
+import uuid
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .caching import bump_organizer_version
+from .models import Contact, ContactInteraction
+from .rollups import increment_rollups
+from .singleflight import acquire_lock, release_lock
+from .stats import apply_stats_delta
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = 'contacts:interactions:buffer'
+PROCESSING_KEY = 'contacts:interactions:processing'
+FLUSH_LOCK_KEY = 'contacts:interactions:flush_lock'
+FLUSH_QUEUED_KEY = 'contacts:interactions:flush_queued'
+DEAD_LETTER_KEY = 'contacts:interactions:dead_letter'
+
+ENTRY_FIELDS = {
+    'id', 'contact_id', 'organizer_id', 'interaction_type', 'description', 'booking_id',
+    'metadata', 'idempotency_key', 'created_at',
+}
+
+_client = None
+
+
+def get_buffer_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.CONTACTS_INTERACTION_BUFFER_URL)
+    return _client
+
+
+def buffering_enabled():
+    return settings.CONTACTS_INTERACTION_WRITE_BUFFER
+
+
+def get_idempotency_cache_key(organizer_id, idempotency_key):
+    return f"contacts:interactions:idempotency:{organizer_id}:{idempotency_key}"
+
+
+def _from_entry(entry, contact, organizer):
+    """Unsaved interaction for a buffered (or in-flight) entry."""
+    return ContactInteraction(
+        id=entry['id'],
+        contact=contact,
+        organizer=organizer,
+        interaction_type=entry['interaction_type'],
+        description=entry['description'],
+        booking_id=entry['booking_id'],
+        metadata=entry['metadata'],
+        idempotency_key=entry['idempotency_key'],
+        created_at=parse_datetime(entry['created_at'])
+    )
+
+
+def record_interaction(contact, organizer, interaction_type, description, booking=None,
+                       metadata=None, idempotency_key=None, created_at=None):
+    """
+    Record an interaction, buffered or inserted directly depending on settings.
+    
+    Returns the ``ContactInteraction``; when buffered it is unsaved but carries
+    the id and ``created_at`` it will be stored with. When ``idempotency_key``
+    was already used by this organizer, the interaction recorded for it is
+    returned instead and nothing is written.
+    """
+    interaction = ContactInteraction(
+        id=uuid.uuid4(),
+        contact=contact,
+        organizer=organizer,
+        interaction_type=interaction_type,
+        description=description,
+        booking=booking,
+        metadata=metadata or {},
+        idempotency_key=idempotency_key or uuid.uuid4().hex,
+        created_at=created_at or timezone.now()
+    )
+    entry = {
+        'id': str(interaction.id),
+        'contact_id': str(contact.pk),
+        'organizer_id': str(organizer.pk),
+        'interaction_type': interaction_type,
+        'description': description,
+        'booking_id': str(booking.pk) if booking else None,
+        'metadata': interaction.metadata,
+        'idempotency_key': interaction.idempotency_key,
+        'created_at': interaction.created_at.isoformat(),
+    }
+    
+    claim_key = None
+    if idempotency_key:
+        claim_key = get_idempotency_cache_key(organizer.pk, idempotency_key)
+        # Held only briefly until the write succeeds, in case the process dies in between
+        claimed = cache.add(claim_key, entry, settings.CONTACTS_SINGLE_FLIGHT_LOCK_TIMEOUT)
+        existing = ContactInteraction.objects.filter(organizer=organizer, idempotency_key=idempotency_key).first()
+        if existing is not None:
+            return existing
+        if not claimed:
+            # Recorded moments ago and still buffered, or being written by a concurrent request
+            pending = cache.get(claim_key)
+            if pending is not None:
+                return _from_entry(pending, contact, organizer)
+            # The other claim lapsed without a write; don't touch a claim that isn't ours
+            claim_key = None
+    
+    try:
+        if buffering_enabled():
+            length = get_buffer_client().rpush(BUFFER_KEY, json.dumps(entry))
+        else:
+            interaction.save(force_insert=True)
+    except Exception:
+        if claim_key:
+            cache.delete(claim_key)
+        raise
+    if claim_key:
+        cache.touch(claim_key, settings.CONTACTS_INTERACTION_IDEMPOTENCY_TIMEOUT)
+    
+    if not buffering_enabled():
+        return interaction
+    
+    if length >= settings.CONTACTS_INTERACTION_FLUSH_THRESHOLD and cache.add(FLUSH_QUEUED_KEY, 1, 30):
+        from .tasks import flush_interaction_buffer
+        flush_interaction_buffer.delay()
+    
+    return interaction
+
+
+def _build_interactions(entries):
+    """Turn buffered entries into instances, dropping those whose contact was deleted since."""
+    contact_ids = {entry['contact_id'] for entry in entries}
+    existing_contacts = {
+        str(contact_id) for contact_id in Contact.objects.filter(id__in=contact_ids).values_list('id', flat=True)
+    }
+    
+    booking_ids = {entry['booking_id'] for entry in entries if entry['booking_id']}
+    existing_bookings = set()
+    if booking_ids:
+        from apps.events.models import Booking
+        existing_bookings = {
+            str(booking_id) for booking_id in Booking.objects.filter(id__in=booking_ids).values_list('id', flat=True)
+        }
+    
+    interactions = []
+    for entry in entries:
+        if entry['contact_id'] not in existing_contacts:
+            continue
+        interactions.append(ContactInteraction(
+            id=entry['id'],
+            contact_id=entry['contact_id'],
+            organizer_id=entry['organizer_id'],
+            interaction_type=entry['interaction_type'],
+            description=entry['description'],
+            booking_id=entry['booking_id'] if entry['booking_id'] in existing_bookings else None,
+            metadata=entry['metadata'],
+            idempotency_key=entry['idempotency_key'],
+            created_at=parse_datetime(entry['created_at'])
+        ))
+    return interactions
+
+
+# Returns the batch a previous flush left unfinished, or moves the next one
+# from the head of the buffer to the (empty) processing list
+CLAIM_BATCH_SCRIPT = """
+local pending = redis.call('LRANGE', KEYS[2], 0, -1)
+if #pending > 0 then
+    return pending
+end
+local batch = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #batch > 0 then
+    redis.call('RPUSH', KEYS[2], unpack(batch))
+    redis.call('LTRIM', KEYS[1], #batch, -1)
+end
+return batch
+"""
+
+# Clears the processing list only if it still holds the committed batch
+ACK_BATCH_SCRIPT = """
+if redis.call('LLEN', KEYS[1]) == tonumber(ARGV[2]) and redis.call('LINDEX', KEYS[1], 0) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _insert_interactions(interactions):
+    """Insert interactions whose idempotency key isn't stored yet, with their rollups; returns those inserted."""
+    # Skip keys already stored (a crashed flush, or a repeated idempotency
+    # key), so each is inserted and counted once
+    seen = set(
+        ContactInteraction.objects.filter(
+            idempotency_key__in={interaction.idempotency_key for interaction in interactions}
+        ).values_list('organizer_id', 'idempotency_key')
+    )
+    seen = {(str(organizer_id), idempotency_key) for organizer_id, idempotency_key in seen}
+    unique_interactions = []
+    for interaction in interactions:
+        key = (str(interaction.organizer_id), interaction.idempotency_key)
+        if key not in seen:
+            seen.add(key)
+            unique_interactions.append(interaction)
+    ContactInteraction.objects.bulk_create(unique_interactions, ignore_conflicts=True)
+    increment_rollups(unique_interactions)
+    return unique_interactions
+
+
+def _dead_letter(client, raw, reason):
+    logger.error(f"Moving buffered interaction to {DEAD_LETTER_KEY} ({reason}): {raw!r}")
+    client.rpush(DEAD_LETTER_KEY, raw)
+
+
+def _flush_entries(client, raw_entries):
+    """Insert one batch of raw buffered entries; returns the interactions inserted."""
+    entries = {}
+    for raw in raw_entries:
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            _dead_letter(client, raw, 'malformed JSON')
+            continue
+        if not isinstance(entry, dict) or not ENTRY_FIELDS <= entry.keys():
+            _dead_letter(client, raw, 'missing fields')
+            continue
+        entries[entry['id']] = (entry, raw)
+    
+    interactions = _build_interactions([entry for entry, _ in entries.values()])
+    try:
+        with transaction.atomic():
+            return _insert_interactions(interactions)
+    except DatabaseError:
+        logger.exception('Buffered interaction batch failed to insert; retrying entries one at a time')
+    
+    inserted = []
+    for interaction in interactions:
+        try:
+            with transaction.atomic():
+                inserted.extend(_insert_interactions([interaction]))
+        except DatabaseError as e:
+            _dead_letter(client, entries[str(interaction.id)][1], e)
+    return inserted
+
+
+def flush_buffer(batch_size=None):
+    """
+    Drain the buffer into the database in batches; returns the number of entries processed.
+    
+    Only one flush runs at a time, under a tokenized lease. A flush that
+    outlives its lease stops claiming batches, and a batch claimed by one
+    flush is never removed by another until it has been committed.
+    """
+    batch_size = batch_size or settings.CONTACTS_INTERACTION_FLUSH_BATCH_SIZE
+    token = acquire_lock(FLUSH_LOCK_KEY, 300)
+    if token is None:
+        return 0
+    
+    client = get_buffer_client()
+    claim_batch = client.register_script(CLAIM_BATCH_SCRIPT)
+    ack_batch = client.register_script(ACK_BATCH_SCRIPT)
+    processed = 0
+    organizer_ids = set()
+    try:
+        cache.delete(FLUSH_QUEUED_KEY)
+        while cache.get(FLUSH_LOCK_KEY) == token:
+            raw_entries = claim_batch(keys=[BUFFER_KEY, PROCESSING_KEY], args=[batch_size])
+            if not raw_entries:
+                break
+            
+            interactions = _flush_entries(client, raw_entries)
+            
+            ack_batch(keys=[PROCESSING_KEY], args=[raw_entries[0], len(raw_entries)])
+            processed += len(raw_entries)
+            organizer_ids.update(interaction.organizer_id for interaction in interactions)
+            for organizer_id, count in Counter(interaction.organizer_id for interaction in interactions).items():
+                apply_stats_delta(organizer_id, recent_interactions=count)
+    finally:
+        release_lock(FLUSH_LOCK_KEY, token)
+        # bulk_create skips post_save, so invalidate cached responses here
+        for organizer_id in organizer_ids:
+            bump_organizer_version(organizer_id)
+    
+    return processed
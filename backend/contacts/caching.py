@@ -0,0 +1,228 @@
+"""
+Per-organizer write versions, conditional GETs and response caching for contact
+endpoints.
+
+Every write to an organizer's contacts, groups, memberships or interactions
+bumps a version counter in the cache (see signals.py). Responses carry an ETag
+derived from that version plus the request path and query, and a Last-Modified
+from the time of the last bump, so polling clients get a 304 before any query
+or serialization runs. List responses are also cached under keys that embed
+the version, so a bump invalidates all of them at once without key scans.
+"""
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from .singleflight import coalesce
+
+
+def get_version_cache_key(organizer_id):
+    return f"contacts:version:{organizer_id}"
+
+
+def get_modified_cache_key(organizer_id):
+    return f"contacts:modified:{organizer_id}"
+
+
+def _initial_version():
+    # Seed from the clock so a counter lost to eviction never reuses old values
+    return int(time.time() * 1000)
+
+
+def get_organizer_version(organizer_id):
+    """Return ``(version, modified_timestamp)`` for an organizer's contact data."""
+    version_key = get_version_cache_key(organizer_id)
+    modified_key = get_modified_cache_key(organizer_id)
+    
+    values = cache.get_many([version_key, modified_key])
+    version = values.get(version_key)
+    modified = values.get(modified_key)
+    
+    if version is None:
+        cache.add(version_key, _initial_version(), None)
+        version = cache.get(version_key)
+    if modified is None:
+        # Unknown modification time: assume "now" so stale clients refetch
+        modified = time.time()
+        cache.add(modified_key, modified, None)
+    
+    return version, modified
+
+
+def bump_organizer_version(organizer_id):
+    """Invalidate every versioned response for an organizer in O(1)."""
+    version_key = get_version_cache_key(organizer_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        if not cache.add(version_key, _initial_version(), None):
+            cache.incr(version_key)
+    cache.set(get_modified_cache_key(organizer_id), time.time(), None)
+
+
+def build_etag(request, version, *extra):
+    """ETag for ``request`` (path and query) at the given organizer version."""
+    parts = [str(request.user.id), str(version), request.get_full_path()]
+    parts.extend(str(value) for value in extra)
+    return quote_etag(hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest())
+
+
+def evaluate_conditional_get(request, *extra, modified=None):
+    """
+    Check ``If-None-Match`` / ``If-Modified-Since`` against the organizer version.
+    
+    ``modified`` is a timestamp for data that can change without a version
+    bump; it moves ``Last-Modified`` forward and should also be in ``extra``.
+    Returns ``(not_modified_response, etag, last_modified)``; the response is
+    None when the client's copy is stale or the request isn't a GET.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None, None, None
+    
+    version, version_modified = get_organizer_version(request.user.id)
+    etag = build_etag(request, version, *extra)
+    last_modified = int(max(version_modified, modified or 0))
+    
+    if get_conditional_response(request._request, etag=etag, last_modified=last_modified) is not None:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        set_validator_headers(response, etag, last_modified)
+        return response, etag, last_modified
+    
+    return None, etag, last_modified
+
+
+def set_validator_headers(response, etag, last_modified):
+    if etag is None:
+        return
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Make browsers revalidate instead of reusing the response heuristically
+    patch_cache_control(response, private=True, no_cache=True)
+
+
+class ConditionalGetMixin:
+    """Answer GETs with 304 Not Modified while the organizer's version is unchanged."""
+    
+    def get_conditional_extra(self):
+        """Extra values mixed into the ETag (e.g. a time bucket for time-relative data)."""
+        return ()
+    
+    def get(self, request, *args, **kwargs):
+        not_modified, etag, last_modified = evaluate_conditional_get(request, *self.get_conditional_extra())
+        if not_modified is not None:
+            return not_modified
+        
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_validator_headers(response, etag, last_modified)
+        return response
+
+
+def conditional_get(extra_func=None, modified_func=None):
+    """
+    Decorator version of ``ConditionalGetMixin`` for ``@api_view`` functions.
+    
+    ``extra_func(request)`` and ``modified_func(request)`` supply the
+    ``extra`` and ``modified`` arguments of ``evaluate_conditional_get``.
+    Place it below ``@permission_classes`` so it runs after authentication.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            extra = extra_func(request) if extra_func else ()
+            modified = modified_func(request) if modified_func else None
+            not_modified, etag, last_modified = evaluate_conditional_get(request, *extra, modified=modified)
+            if not_modified is not None:
+                return not_modified
+            
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                set_validator_headers(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
+
+
+RESPONSE_CACHE_HITS_KEY = 'contacts:response_cache:hits'
+RESPONSE_CACHE_MISSES_KEY = 'contacts:response_cache:misses'
+
+
+def normalize_query_params(query_params):
+    """Stable representation of a QueryDict: sorted keys and values, blanks dropped."""
+    items = []
+    for key in sorted(query_params.keys()):
+        values = sorted(value for value in query_params.getlist(key) if value != '')
+        if values:
+            items.append((key, values))
+    return items
+
+
+def get_response_cache_key(request, version):
+    query_hash = hashlib.md5(
+        repr(normalize_query_params(request.query_params)).encode('utf-8')
+    ).hexdigest()
+    path_hash = hashlib.md5(request.path.encode('utf-8')).hexdigest()
+    return f"contacts:response:{request.user.id}:{version}:{path_hash}:{query_hash}"
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_response_cache_metrics():
+    """Hit/miss counters for the contact response cache since the last reset."""
+    values = cache.get_many([RESPONSE_CACHE_HITS_KEY, RESPONSE_CACHE_MISSES_KEY])
+    hits = values.get(RESPONSE_CACHE_HITS_KEY, 0)
+    misses = values.get(RESPONSE_CACHE_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
+
+
+def reset_response_cache_metrics():
+    cache.delete_many([RESPONSE_CACHE_HITS_KEY, RESPONSE_CACHE_MISSES_KEY])
+
+
+class ResponseCacheMixin:
+    """
+    Cache successful GET response data per organizer version and query.
+    
+    Misses are coalesced, so a burst of identical requests renders once.
+    Place after ``ConditionalGetMixin`` so 304s are answered first.
+    """
+    
+    def get(self, request, *args, **kwargs):
+        version, _ = get_organizer_version(request.user.id)
+        cache_key = get_response_cache_key(request, version)
+        
+        data = cache.get(cache_key)
+        if data is not None:
+            _count(RESPONSE_CACHE_HITS_KEY)
+            return Response(data)
+        
+        _count(RESPONSE_CACHE_MISSES_KEY)
+        
+        def render():
+            response = super(ResponseCacheMixin, self).get(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(cache_key, response.data, settings.CONTACTS_RESPONSE_CACHE_TIMEOUT)
+            return response
+        
+        def reload():
+            data = cache.get(cache_key)
+            return Response(data) if data is not None else None
+        
+        # Concurrent identical requests (e.g. several dashboard tabs) share one render
+        return coalesce(f"{cache_key}:lock", render, reload)
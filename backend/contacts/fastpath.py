@@ -0,0 +1,81 @@
+"""
+High-throughput serialization for contact list responses.
+
+``ContactSerializer`` instantiates a field tree and walks it for every row,
+which dominates CPU for large pages. The fast path reads ``values()`` rows
+and builds plain dicts whose content and key order match ``ContactSerializer``
+exactly, so rendering them with ``ORJSONRenderer`` gives the same bytes as the
+regular path.
+"""
+from django.utils import timezone
+from rest_framework.settings import api_settings
+from rest_framework import ISO_8601
+from .renderers import ORJSONRenderer
+from .serializers import ContactSerializer
+
+
+def format_datetime(value):
+    """Format a datetime the way DRF's ``DateTimeField`` does with ISO 8601 output."""
+    if not value:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _full_name(row):
+    return f"{row['first_name']} {row['last_name']}".strip()
+
+
+# Serializer field -> (columns read, function building the value from the row)
+CONTACT_FIELD_BUILDERS = {
+    'id': (('id',), lambda row: str(row['id'])),
+    'first_name': (('first_name',), lambda row: row['first_name']),
+    'last_name': (('last_name',), lambda row: row['last_name']),
+    'full_name': (('first_name', 'last_name'), _full_name),
+    'email': (('email',), lambda row: row['email']),
+    'phone': (('phone',), lambda row: row['phone']),
+    'company': (('company',), lambda row: row['company']),
+    'job_title': (('job_title',), lambda row: row['job_title']),
+    'notes': (('notes',), lambda row: row['notes']),
+    'tags': (('tags',), lambda row: row['tags']),
+    'total_bookings': (('total_bookings',), lambda row: row['total_bookings']),
+    'last_booking_date': (('last_booking_date',), lambda row: format_datetime(row['last_booking_date'])),
+    'groups_count': (('groups_count',), lambda row: row['groups_count']),
+    'is_active': (('is_active',), lambda row: row['is_active']),
+    'created_at': (('created_at',), lambda row: format_datetime(row['created_at'])),
+    'updated_at': (('updated_at',), lambda row: format_datetime(row['updated_at'])),
+}
+
+
+def fast_path_available():
+    return ORJSONRenderer.is_available() and api_settings.DATETIME_FORMAT == ISO_8601
+
+
+def get_contact_columns(fields, always=('id', 'first_name', 'last_name')):
+    """
+    Columns to fetch with ``values()`` for the given serializer fields.
+    
+    ``always`` covers the keyset pagination ordering, which cursors are built from.
+    """
+    columns = list(always)
+    for name in fields:
+        for column in CONTACT_FIELD_BUILDERS[name][0]:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def build_contact_rows(rows, fields):
+    """Turn ``values()`` rows into ``ContactSerializer``-shaped dicts."""
+    builders = [(name, CONTACT_FIELD_BUILDERS[name][1]) for name in fields]
+    return [{name: build(row) for name, build in builders} for row in rows]
+
+
+def get_contact_fields(selected=None):
+    """``ContactSerializer`` field names in output order, limited to ``selected``."""
+    fields = ContactSerializer.Meta.fields
+    if selected is None:
+        return list(fields)
+    return [name for name in fields if name in selected]
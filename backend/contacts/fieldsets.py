@@ -0,0 +1,87 @@
+"""
+Sparse fieldsets for contact endpoints.
+
+Clients pass ``?fields=id,full_name,email`` (or ``?exclude=notes,tags``) on GET
+requests. The selection trims the serializer output and, through
+``SparseFieldsetViewMixin.apply_sparse_fieldset``, the columns loaded from SQL.
+"""
+
+
+def parse_field_list(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_fieldset(request, available):
+    """
+    Return the subset of ``available`` field names selected by the request.
+    
+    Returns None when the request doesn't ask for a sparse fieldset (or isn't a
+    GET), meaning every field is wanted. Unknown names are ignored.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    
+    fields = request.query_params.get('fields')
+    exclude = request.query_params.get('exclude')
+    if not fields and not exclude:
+        return None
+    
+    selected = set(available)
+    if fields:
+        selected &= parse_field_list(fields)
+    if exclude:
+        selected -= parse_field_list(exclude)
+    return selected
+
+
+class SparseFieldsetSerializerMixin:
+    """Drop serializer fields not selected by ``?fields=`` / ``?exclude=``."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = get_sparse_fieldset(self.context.get('request'), self.fields.keys())
+        if selected is None:
+            return
+        
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Project querysets onto the columns needed by the selected serializer fields.
+    
+    ``sparse_field_dependencies`` maps serializer fields whose source isn't a
+    model field of the same name (properties, annotations, related lookups) to
+    the model fields they read; an empty tuple means no column is needed.
+    ``sparse_always_load`` lists columns loaded regardless of the selection,
+    such as those used for ordering and pagination cursors.
+    """
+    sparse_field_dependencies = {}
+    sparse_always_load = ('id',)
+    
+    def get_sparse_fieldset(self):
+        if not hasattr(self, '_sparse_fieldset'):
+            self._sparse_fieldset = None
+            if self.request.method == 'GET':
+                available = self.get_serializer_class()().fields.keys()
+                self._sparse_fieldset = get_sparse_fieldset(self.request, available)
+        return self._sparse_fieldset
+    
+    def sparse_field_selected(self, name):
+        selected = self.get_sparse_fieldset()
+        return selected is None or name in selected
+    
+    def apply_sparse_fieldset(self, queryset):
+        """Restrict ``queryset`` with ``.only()`` to the columns the selection needs."""
+        selected = self.get_sparse_fieldset()
+        if selected is None:
+            return queryset
+        
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = set(self.sparse_always_load)
+        for name in selected:
+            columns.update(self.sparse_field_dependencies.get(name, (name,)))
+        
+        return queryset.only(*(column for column in columns if column.split('__')[0] in model_fields))
@@ -0,0 +1,107 @@
+from datetime import datetime, time
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from .models import ContactInteraction
+from .search import apply_contact_search
+
+
+def filter_contacts(queryset, params):
+    """
+    Apply the contact list filters (group, tags, is_active, search) to ``queryset``.
+    
+    ``params`` is a QueryDict or a plain dict with the same keys, so the contact
+    list and bulk endpoints share one filter expression format. Results are
+    ordered by name, or by relevance when searching.
+    """
+    # Filter by group
+    group_id = params.get('group')
+    if group_id:
+        queryset = queryset.filter(groups__id=group_id)
+    
+    # Filter by tags ('all' by default, or 'any' via tags_mode)
+    # Note: This uses PostgreSQL-specific JSONField __contains (@>) lookups,
+    # which the jsonb_path_ops GIN index on tags supports
+    tags = params.get('tags')
+    if tags:
+        if isinstance(tags, str):
+            tags = tags.split(',')
+        tag_list = [tag.strip() for tag in tags if tag.strip()]
+        if params.get('tags_mode') == 'any':
+            tags_filter = Q()
+            for tag in tag_list:
+                tags_filter |= Q(tags__contains=[tag])
+            queryset = queryset.filter(tags_filter)
+        elif tag_list:
+            queryset = queryset.filter(tags__contains=tag_list)
+    
+    # Filter by active status
+    is_active = params.get('is_active')
+    if is_active is not None:
+        queryset = queryset.filter(is_active=str(is_active).lower() == 'true')
+    
+    # Full-text search, ranked by relevance
+    search = params.get('search')
+    if search:
+        return apply_contact_search(queryset, search)
+    
+    return queryset.order_by('first_name', 'last_name')
+
+
+def parse_window_bound(value, name):
+    """Parse a ``since``/``until`` value given as an ISO 8601 datetime or date."""
+    try:
+        # Well-formed but impossible values (e.g. 2024-02-30) raise ValueError
+        parsed = parse_datetime(value)
+        day = parse_date(value) if parsed is None else None
+    except ValueError:
+        parsed = day = None
+    if parsed is None:
+        if day is None:
+            raise ValidationError({name: 'Use an ISO 8601 date or datetime.'})
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_interaction_filters(params):
+    """Validate the interaction timeline filters; returns ``(interaction_types, since, until)``."""
+    interaction_types = None
+    interaction_type = params.get('interaction_type')
+    if interaction_type:
+        interaction_types = [value.strip() for value in interaction_type.split(',') if value.strip()]
+        valid_types = {choice for choice, _ in ContactInteraction.INTERACTION_TYPES}
+        invalid = [value for value in interaction_types if value not in valid_types]
+        if invalid:
+            raise ValidationError({'interaction_type': f"Unknown interaction types: {', '.join(invalid)}"})
+    
+    since = params.get('since')
+    until = params.get('until')
+    since = parse_window_bound(since, 'since') if since else None
+    until = parse_window_bound(until, 'until') if until else None
+    if since and until and since >= until:
+        raise ValidationError({'until': 'until must be later than since.'})
+    
+    return interaction_types, since, until
+
+
+def filter_interactions(queryset, params):
+    """
+    Apply the interaction timeline filters to ``queryset``.
+    
+    ``interaction_type`` takes one or more comma-separated types; ``since``
+    (inclusive) and ``until`` (exclusive) bound ``created_at`` so the timeline
+    is an index range scan, and on a partitioned table only touches the
+    partitions in the window.
+    """
+    interaction_types, since, until = parse_interaction_filters(params)
+    if interaction_types:
+        queryset = queryset.filter(interaction_type__in=interaction_types)
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    if until:
+        queryset = queryset.filter(created_at__lt=until)
+    
+    return queryset
@@ -0,0 +1,129 @@
+import time
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from apps.contacts.fastpath import (
+    fast_path_available, get_contact_fields, get_contact_columns, build_contact_rows
+)
+from apps.contacts.filters import filter_contacts
+from apps.contacts.models import Contact
+from apps.contacts.renderers import ORJSONRenderer
+from apps.contacts.serializers import ContactSerializer
+
+
+class FixtureRollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare ContactSerializer + JSONRenderer against the values()/orjson fast path on real querysets'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'organizer',
+            help='Email of the organizer whose contacts are listed'
+        )
+        parser.add_argument(
+            '--page-sizes',
+            default='20,200,2000',
+            help='Comma-separated page sizes to benchmark (default: 20,200,2000)'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Requests per page size and path (default: 20)'
+        )
+        parser.add_argument(
+            '--create-fixtures',
+            action='store_true',
+            help='Top the organizer up to the largest page size with generated contacts, rolled back afterwards'
+        )
+    
+    def handle(self, *args, **options):
+        if not fast_path_available():
+            raise CommandError('Fast path unavailable: install orjson and use ISO 8601 DATETIME_FORMAT')
+        
+        try:
+            organizer = get_user_model().objects.get(email=options['organizer'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Organizer {options['organizer']} not found")
+        
+        page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+        
+        try:
+            with transaction.atomic():
+                if options['create_fixtures']:
+                    self._create_fixtures(organizer, max(page_sizes))
+                self._run(organizer, page_sizes, options['iterations'])
+                if options['create_fixtures']:
+                    raise FixtureRollback()
+        except FixtureRollback:
+            pass
+    
+    def _run(self, organizer, page_sizes, iterations):
+        fields = get_contact_fields()
+        columns = get_contact_columns(fields)
+        # The same queryset the contact list view paginates
+        queryset = filter_contacts(Contact.objects.filter(organizer=organizer).with_groups_count(), {})
+        
+        available = queryset.count()
+        if available < max(page_sizes):
+            raise CommandError(
+                f'{organizer.email} has {available} contacts; at least {max(page_sizes)} are needed '
+                '(use --create-fixtures)'
+            )
+        
+        self.stdout.write(f"{'page size':>10} {'serializer rows/s':>18} {'fast path rows/s':>17} {'speedup':>8}")
+        
+        for page_size in page_sizes:
+            def serializer_path():
+                # Query, model hydration, field tree walk and rendering
+                return JSONRenderer().render(ContactSerializer(list(queryset[:page_size]), many=True).data)
+            
+            def fast_path():
+                rows = list(queryset.values(*columns)[:page_size])
+                return ORJSONRenderer().render(build_contact_rows(rows, fields))
+            
+            # Both paths must render the same bytes
+            if serializer_path() != fast_path():
+                raise CommandError(f'Fast path output differs from ContactSerializer at page size {page_size}')
+            
+            slow_rate = self._rows_per_second(serializer_path, page_size, iterations)
+            fast_rate = self._rows_per_second(fast_path, page_size, iterations)
+            
+            self.stdout.write(
+                f"{page_size:>10} {slow_rate:>18,.0f} {fast_rate:>17,.0f} {fast_rate / slow_rate:>7.1f}x"
+            )
+    
+    @staticmethod
+    def _rows_per_second(render, page_size, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            render()
+        return page_size * iterations / (time.perf_counter() - start)
+    
+    def _create_fixtures(self, organizer, count):
+        existing = Contact.objects.filter(organizer=organizer).count()
+        now = timezone.now()
+        
+        contacts = []
+        for i in range(existing, count):
+            contacts.append(Contact(
+                organizer=organizer,
+                first_name=f'First{i}',
+                last_name=f'Last{i}' if i % 3 else '',
+                email=f'benchmark-contact{i}@example.com',
+                phone='+1 555 0100',
+                company=f'Company {i % 50}',
+                job_title='Engineer',
+                notes='Met at the conference. ' * (i % 5),
+                tags=['customer', f'segment-{i % 7}'],
+                total_bookings=i % 11,
+                last_booking_date=now - timedelta(days=i) if i % 2 else None,
+                is_active=bool(i % 4),
+            ))
+        Contact.objects.bulk_create(contacts, batch_size=1000)
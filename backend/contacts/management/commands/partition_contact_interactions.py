@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.contacts.partitions import (
+    partitioning_supported, is_partitioned, convert_to_partitioned_table,
+    ensure_partitions, drop_expired_partitions
+)
+
+
+class Command(BaseCommand):
+    help = 'Convert contact_interactions to a monthly partitioned table and maintain its partitions'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Convert the existing table in place (one-time, locks the table while copying)'
+        )
+        parser.add_argument(
+            '--drop-expired',
+            action='store_true',
+            help='Also drop partitions older than CONTACTS_INTERACTION_RETENTION_MONTHS'
+        )
+    
+    def handle(self, *args, **options):
+        if not partitioning_supported():
+            raise CommandError('Table partitioning requires PostgreSQL')
+        
+        if not is_partitioned():
+            if not options['convert']:
+                raise CommandError('contact_interactions is not partitioned yet; rerun with --convert')
+            copied = convert_to_partitioned_table()
+            self.stdout.write(self.style.SUCCESS(f'Converted contact_interactions, copied {copied} rows'))
+        
+        for name in ensure_partitions():
+            self.stdout.write(f'Created partition {name}')
+        
+        if options['drop_expired']:
+            for name in drop_expired_partitions():
+                self.stdout.write(f'Dropped partition {name}')
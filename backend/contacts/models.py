@@ -1,7 +1,23 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 import uuid
 
 
+class ContactQuerySet(models.QuerySet):
+    def with_groups_count(self):
+        """Annotate ``groups_count`` with a correlated subquery (one query per page, not per row)."""
+        memberships = ContactGroup.contacts.through.objects.filter(
+            contact_id=OuterRef('pk')
+        ).order_by().values('contact_id').annotate(count=Count('*')).values('count')
+        return self.annotate(
+            groups_count=Coalesce(Subquery(memberships, output_field=IntegerField()), 0)
+        )
+
+
 class Contact(models.Model):
     """Contact model for organizer's contact list."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -26,19 +42,46 @@ class Contact(models.Model):
     # Status
     is_active = models.BooleanField(default=True)
     
+    # Full-text search document, kept in sync by signals (see search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    # Compact per-organizer integer id, used as the bit position in group bitmaps
+    index_id = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ContactQuerySet.as_manager()
+    
     class Meta:
         db_table = 'contacts'
-        unique_together = ['organizer', 'email']
+        unique_together = [['organizer', 'email'], ['organizer', 'index_id']]
         verbose_name = 'Contact'
         verbose_name_plural = 'Contacts'
         ordering = ['first_name', 'last_name']
+        indexes = [
+            # Supports keyset pagination over (first_name, last_name, id)
+            models.Index(fields=['organizer', 'first_name', 'last_name', 'id'], name='contacts_org_name_idx'),
+            GinIndex(fields=['search_vector'], name='contacts_search_gin'),
+            GinIndex(fields=['tags'], name='contacts_tags_gin', opclasses=['jsonb_path_ops']),
+            # Organizer-scoped trigram indexes for typeahead suggestions, so a
+            # probe only visits one tenant's entries (requires pg_trgm and btree_gin)
+            GinIndex(F('organizer'), OpClass(F('first_name'), name='gin_trgm_ops'), name='contacts_first_name_trgm'),
+            GinIndex(F('organizer'), OpClass(F('last_name'), name='gin_trgm_ops'), name='contacts_last_name_trgm'),
+            GinIndex(F('organizer'), OpClass(F('email'), name='gin_trgm_ops'), name='contacts_email_trgm'),
+            GinIndex(F('organizer'), OpClass(F('company'), name='gin_trgm_ops'), name='contacts_company_trgm'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets signals tell whether a save changed the email (absent when deferred)
+        instance._loaded_email = instance.__dict__.get('email')
+        return instance
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
@@ -56,6 +99,13 @@ class ContactGroup(models.Model):
     # Contacts in this group
     contacts = models.ManyToManyField(Contact, blank=True, related_name='groups')
     
+    # Denormalized membership count, maintained by signals (see signals.py)
+    # and repaired by the reconcile_group_member_counts task
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    # Smart groups: membership is derived from these rules (see rules.py)
+    rules = models.JSONField(null=True, blank=True, help_text="Membership rules for smart groups")
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -71,7 +121,40 @@ class ContactGroup(models.Model):
     
     @property
     def contact_count(self):
-        return self.contacts.count()
+        return self.member_count
+    
+    @property
+    def is_smart(self):
+        return self.rules is not None
+
+
+class ContactIndexSequence(models.Model):
+    """Allocator for per-organizer ``Contact.index_id`` values."""
+    organizer = models.OneToOneField('users.User', on_delete=models.CASCADE, related_name='contact_index_sequence')
+    next_id = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'contact_index_sequences'
+        verbose_name = 'Contact Index Sequence'
+        verbose_name_plural = 'Contact Index Sequences'
+    
+    def __str__(self):
+        return f"{self.organizer_id} - {self.next_id}"
+
+
+class ContactGroupBitmap(models.Model):
+    """Compressed bitset of member ``Contact.index_id`` values for a group (see bitmaps.py)."""
+    group = models.OneToOneField(ContactGroup, on_delete=models.CASCADE, primary_key=True, related_name='bitmap')
+    data = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'contact_group_bitmaps'
+        verbose_name = 'Contact Group Bitmap'
+        verbose_name_plural = 'Contact Group Bitmaps'
+    
+    def __str__(self):
+        return f"Bitmap for {self.group_id}"
 
 
 class ContactInteraction(models.Model):
@@ -98,13 +181,112 @@ class ContactInteraction(models.Model):
     # Additional data
     metadata = models.JSONField(default=lambda: {}, blank=True)
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Deduplicates retried writes per organizer (see buffer.py)
+    idempotency_key = models.CharField(max_length=100, null=True, blank=True, editable=False)
+    
+    # Set when the interaction is recorded, not when a buffered write is flushed
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         db_table = 'contact_interactions'
         verbose_name = 'Contact Interaction'
         verbose_name_plural = 'Contact Interactions'
         ordering = ['-created_at']
+        indexes = [
+            # Supports keyset pagination over (-created_at, id)
+            models.Index(fields=['organizer', '-created_at', 'id'], name='interactions_org_created_idx'),
+            # Per-contact timelines and the interaction_type filter
+            models.Index(fields=['contact', '-created_at', 'id'], name='interactions_contact_time_idx'),
+            models.Index(
+                fields=['organizer', 'interaction_type', '-created_at', 'id'],
+                name='interactions_org_type_idx'
+            ),
+            # Idempotency key lookups before recording an interaction
+            models.Index(fields=['organizer', 'idempotency_key'], name='interactions_org_idem_idx'),
+        ]
+        constraints = [
+            # Includes created_at so it stays valid on the partitioned table; it
+            # only catches repeats for writes with a deterministic created_at
+            models.UniqueConstraint(
+                fields=['idempotency_key', 'created_at'],
+                name='interactions_idempotency_key_uniq'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.contact.full_name} - {self.get_interaction_type_display()}"
+
+
+class InteractionDailyRollup(models.Model):
+    """Interactions recorded per organizer, UTC day and type (see rollups.py)."""
+    organizer = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='contact_interaction_rollups')
+    day = models.DateField()
+    interaction_type = models.CharField(max_length=30, choices=ContactInteraction.INTERACTION_TYPES)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'contact_interaction_daily_rollups'
+        verbose_name = 'Interaction Daily Rollup'
+        verbose_name_plural = 'Interaction Daily Rollups'
+        ordering = ['-day', 'interaction_type']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organizer', 'day', 'interaction_type'],
+                name='interaction_rollups_org_day_type_uniq'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.organizer_id} - {self.day} - {self.interaction_type}: {self.count}"
+
+
+class InteractionArchiveSegment(models.Model):
+    """A month of an organizer's archived interactions, stored as gzipped JSONL (see archive.py)."""
+    organizer = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='contact_interaction_archives')
+    month = models.DateField(help_text="First day of the archived month (UTC)")
+    path = models.CharField(max_length=255)
+    row_count = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'contact_interaction_archive_segments'
+        verbose_name = 'Interaction Archive Segment'
+        verbose_name_plural = 'Interaction Archive Segments'
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(fields=['organizer', 'month'], name='interaction_archives_org_month_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.organizer_id} - {self.month:%Y-%m} ({self.row_count} interactions)"
+
+
+class ContactStatsSnapshot(models.Model):
+    """Precomputed ``contact_stats`` payload for an organizer (see stats.py)."""
+    organizer = models.OneToOneField(
+        'users.User', on_delete=models.CASCADE, primary_key=True, related_name='contact_stats_snapshot'
+    )
+    total_contacts = models.IntegerField(default=0)
+    active_contacts = models.IntegerField(default=0)
+    total_groups = models.IntegerField(default=0)
+    recent_interactions = models.IntegerField(default=0)
+    top_companies = models.JSONField(default=list)
+    booking_frequency = models.JSONField(default=dict)
+    
+    # Set by writes that deltas can't express; cleared by the debounced recompute
+    is_dirty = models.BooleanField(default=False)
+    dirty_since = models.DateTimeField(null=True, blank=True)
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'contact_stats_snapshots'
+        verbose_name = 'Contact Stats Snapshot'
+        verbose_name_plural = 'Contact Stats Snapshots'
+        indexes = [
+            models.Index(fields=['is_dirty', 'dirty_since'], name='contact_stats_dirty_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.contact.full_name} - {self.get_interaction_type_display()}"
\ No newline at end of file
+        return f"Contact stats for {self.organizer_id}"
\ No newline at end of file
@@ -0,0 +1,396 @@
+"""
+Pagination for contact endpoints.
+
+Page-number pagination costs an ``OFFSET n`` plus a ``COUNT(*)`` over the whole
+filtered set on every request. ``ContactPageNumberPagination`` swaps the exact
+count for a planner estimate on large sets, and keyset pagination seeks straight
+to the last row of the previous page using the view's stable ordering, so page N
+costs the same as page 1.
+"""
+import base64
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import partial
+from itertools import islice
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, Paginator as DjangoPaginator
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .archive import interaction_sort_key, row_sort_key
+from .caching import get_organizer_version
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_queryset_count(queryset):
+    """Return the planner's row estimate for ``queryset``, or None if unavailable."""
+    if connection.vendor != 'postgresql':
+        return None
+    
+    try:
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except (DatabaseError, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.warning(f"Could not estimate queryset count: {str(e)}")
+        return None
+
+
+def cached_exact_count(queryset, version=None):
+    """
+    Return ``COUNT(*)`` for ``queryset``, cached briefly by its SQL.
+    
+    Pass the organizer's data version so that writes invalidate the count
+    instead of leaving it stale until the cache entry expires.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(f"{version}|{sql}|{params!r}".encode('utf-8')).hexdigest()
+    cache_key = f"contacts:count:{digest}"
+    
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, settings.CONTACTS_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class EstimatedCountPage(Page):
+    """A page that knows whether a next page exists without consulting the count."""
+    
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+    
+    def has_next(self):
+        return self._has_next
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    """
+    Paginator whose count is a planner estimate above a threshold.
+    
+    Below ``CONTACTS_APPROXIMATE_COUNT_THRESHOLD`` rows the exact count is used,
+    served from cache for ``CONTACTS_COUNT_CACHE_TIMEOUT`` seconds. Either way
+    the count is only displayed: pages fetch one extra row to decide whether a
+    next page exists, so an estimate that is off never hides or empties pages.
+    """
+    count_is_approximate = False
+    
+    def __init__(self, object_list, per_page, count_version=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_version = count_version
+    
+    @cached_property
+    def count(self):
+        estimate = estimate_queryset_count(self.object_list)
+        if estimate is not None and estimate >= settings.CONTACTS_APPROXIMATE_COUNT_THRESHOLD:
+            self.count_is_approximate = True
+            return estimate
+        return cached_exact_count(self.object_list, self.count_version)
+    
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # Only enforce the lower bound; pages past the count are checked by fetching them
+            number = int(number)
+            if number < 1:
+                raise
+            return number
+    
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return EstimatedCountPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+class ContactPageNumberPagination(PageNumberPagination):
+    """Page-number pagination that flags when ``count`` is an estimate."""
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_version = None
+    
+    @property
+    def django_paginator_class(self):
+        return partial(EstimatedCountPaginator, count_version=self.count_version)
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.user.is_authenticated:
+            self.count_version, _ = get_organizer_version(request.user.id)
+        return super().paginate_queryset(queryset, request, view)
+    
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_is_approximate', self.page.paginator.count_is_approximate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+    
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_approximate'] = {'type': 'boolean'}
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a multi-column ordering that ends in a unique column.
+    
+    Unlike DRF's ``CursorPagination`` (which positions on the first ordering
+    field only), the cursor holds the full ordering tuple of the boundary row.
+    """
+    ordering = ('id',)
+    # Type of each ordering column's cursor value: 'str', 'uuid' or 'datetime'
+    cursor_types = ('uuid',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.view = view
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request)
+        
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+        
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, self.position))
+        
+        results = self.get_rows(queryset, self.page_size + 1)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        
+        self.page = results
+        return results
+    
+    def get_rows(self, queryset, limit):
+        """Fetch up to ``limit`` rows past the cursor, already ordered and seek-filtered."""
+        return list(queryset[:limit])
+    
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+    
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+    
+    def get_page_size(self, request):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+        try:
+            requested = int(request.query_params.get(self.page_size_query_param, page_size))
+        except (TypeError, ValueError):
+            return page_size
+        return max(1, min(requested, self.max_page_size))
+    
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._build_link(self.page[-1], reverse=False)
+    
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._build_link(self.page[0], reverse=True)
+    
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r', False))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        
+        # A tampered value would otherwise fail only when the query runs
+        try:
+            position = [self._parse_cursor_value(kind, value) for kind, value in zip(self.cursor_types, position)]
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        
+        return position, reverse
+    
+    @staticmethod
+    def _parse_cursor_value(kind, value):
+        if not isinstance(value, str):
+            raise TypeError(f"Expected a string, got {type(value).__name__}")
+        if kind == 'uuid':
+            return UUID(value)
+        if kind == 'datetime':
+            parsed = parse_datetime(value)
+            if parsed is None or parsed.tzinfo is None:
+                raise ValueError(f"Invalid datetime: {value}")
+            return parsed
+        return value
+    
+    def encode_cursor(self, position, reverse):
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = True
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+        return encoded.rstrip('=')
+    
+    def _build_link(self, instance, reverse):
+        position = [self._to_cursor_value(self._get_value(instance, field.lstrip('-'))) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+    
+    @staticmethod
+    def _get_value(instance, name):
+        # Rows may be model instances or dicts from .values()
+        if isinstance(instance, dict):
+            return instance[name]
+        return getattr(instance, name)
+    
+    @staticmethod
+    def _to_cursor_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, UUID):
+            return str(value)
+        return value
+    
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+    
+    @staticmethod
+    def _seek_filter(ordering, position):
+        """
+        Rows strictly after ``position`` in ``ordering``.
+        
+        Expands the tuple comparison into ``(a > x) OR (a = x AND b > y) OR ...``
+        so mixed ascending/descending orderings are supported. The expansion
+        alone is not an index range condition, so it is ANDed with the
+        redundant bound ``a >= x`` on the leading column, which lets the
+        planner start the ordered index scan at the cursor.
+        """
+        condition = Q()
+        equal_prefix = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal_prefix & Q(**{f'{name}__{lookup}': value})
+            equal_prefix &= Q(**{name: value})
+        
+        leading = ordering[0]
+        leading_lookup = 'lte' if leading.startswith('-') else 'gte'
+        return Q(**{f'{leading.lstrip("-")}__{leading_lookup}': position[0]}) & condition
+
+
+class ContactKeysetPagination(KeysetPagination):
+    ordering = ('first_name', 'last_name', 'id')
+    cursor_types = ('str', 'str', 'uuid')
+
+
+class ContactInteractionKeysetPagination(KeysetPagination):
+    """
+    Interaction timeline cursor pagination that continues into archived segments.
+    
+    When the view's ``get_archived_rows`` returns rows (the client asked for
+    archived history), they are merged with the live rows in list order, so
+    paging past the oldest live interaction continues seamlessly into the archive.
+    """
+    ordering = ('-created_at', 'id')
+    cursor_types = ('datetime', 'uuid')
+    
+    def get_rows(self, queryset, limit):
+        rows = super().get_rows(queryset, limit)
+        # Archived rows are older than live ones, so a full forward page needs no archive reads
+        if len(rows) >= limit and not self.reverse:
+            return rows
+        
+        get_archived_rows = getattr(self.view, 'get_archived_rows', None)
+        boundary = self.position[0] if self.position is not None else None
+        archived = get_archived_rows(descending=not self.reverse, boundary=boundary) if get_archived_rows else None
+        if archived is None:
+            return rows
+        
+        if self.position is not None:
+            position_key = interaction_sort_key(*self.position)
+            if self.reverse:
+                archived = (row for row in archived if row_sort_key(row) < position_key)
+            else:
+                archived = (row for row in archived if row_sort_key(row) > position_key)
+        
+        merged = rows + list(islice(archived, limit))
+        merged.sort(key=self._row_key, reverse=self.reverse)
+        return merged[:limit]
+    
+    @staticmethod
+    def _row_key(row):
+        if isinstance(row, dict):
+            return row_sort_key(row)
+        return interaction_sort_key(row.created_at, row.id)
+
+
+class KeysetPaginationMixin:
+    """
+    Use ``keyset_pagination_class`` when the client asks for cursor pagination.
+    
+    Clients opt in with ``?pagination=cursor`` on the first page; subsequent
+    pages follow the ``next``/``previous`` links, which carry ``?cursor=``.
+    Without either parameter the default page-number pagination is used.
+    """
+    keyset_pagination_class = None
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.keyset_pagination_class and self.wants_keyset_pagination():
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = self.pagination_class() if self.pagination_class else None
+        return self._paginator
+    
+    def wants_keyset_pagination(self):
+        params = self.request.query_params
+        return 'cursor' in params or params.get('pagination') == 'cursor'
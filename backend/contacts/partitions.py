@@ -0,0 +1,249 @@
+"""
+Monthly range partitioning of ``contact_interactions`` on ``created_at``.
+
+The table is converted once with the ``partition_contact_interactions``
+management command; afterwards ``maintain_interaction_partitions`` (run daily
+by Celery beat) keeps ``CONTACTS_INTERACTION_PARTITIONS_AHEAD`` future months
+created and drops whole partitions older than
+``CONTACTS_INTERACTION_RETENTION_MONTHS`` instead of issuing DELETEs. Queries
+with ``created_at`` bounds only touch the matching partitions.
+
+A DEFAULT partition catches rows outside every monthly range (missed
+maintenance runs, old buffered timestamps), so inserts never fail for lack of
+a partition. Maintenance creates the months those rows belong to and moves
+them out of the default partition.
+
+Postgres requires the partition key in every unique constraint, so the
+database primary key becomes ``(id, created_at)``; the ORM keeps using ``id``.
+"""
+import re
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import ContactInteraction
+
+PARENT_TABLE = ContactInteraction._meta.db_table
+LEGACY_TABLE = f'{PARENT_TABLE}_legacy'
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+PARTITION_NAME_RE = re.compile(rf'^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$')
+
+
+def partitioning_supported():
+    return connection.vendor == 'postgresql'
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months):
+    month_index = value.year * 12 + value.month - 1 + months
+    return datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def get_partition_name(month):
+    return f'{PARENT_TABLE}_p{month.year:04d}{month.month:02d}'
+
+
+def is_partitioned():
+    if not partitioning_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [PARENT_TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """Return ``{month_start: table_name}`` for the existing monthly partitions."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [PARENT_TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            partitions[datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc)] = name
+    return partitions
+
+
+def create_default_partition():
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {qn(DEFAULT_PARTITION)} PARTITION OF {qn(PARENT_TABLE)} DEFAULT")
+
+
+def get_default_partition_months():
+    """Months that have rows sitting in the default partition."""
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', {qn('created_at')} AT TIME ZONE 'UTC') FROM {qn(DEFAULT_PARTITION)}"
+        )
+        return sorted(month_start(row[0]) for row in cursor.fetchall())
+
+
+def create_partition(month):
+    """
+    Create the partition holding ``[month, next month)`` if it doesn't exist.
+    
+    Postgres refuses to add a partition while the default partition holds rows
+    in its range, so those rows are moved into the new partition first.
+    """
+    lower = month_start(month)
+    upper = add_months(lower, 1)
+    qn = connection.ops.quote_name
+    parent, default, created_at = qn(PARENT_TABLE), qn(DEFAULT_PARTITION), qn('created_at')
+    create_sql = (
+        f"CREATE TABLE IF NOT EXISTS {qn(get_partition_name(lower))} "
+        f"PARTITION OF {parent} FOR VALUES FROM (%s) TO (%s)"
+    )
+    
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [DEFAULT_PARTITION])
+        has_default = cursor.fetchone()[0]
+        stray = False
+        if has_default:
+            cursor.execute(
+                f"SELECT 1 FROM {default} WHERE {created_at} >= %s AND {created_at} < %s LIMIT 1",
+                [lower, upper]
+            )
+            stray = cursor.fetchone() is not None
+        
+        if not stray:
+            cursor.execute(create_sql, [lower, upper])
+            return
+        
+        cursor.execute(f"ALTER TABLE {parent} DETACH PARTITION {default}")
+        cursor.execute(create_sql, [lower, upper])
+        cursor.execute(
+            f"INSERT INTO {parent} SELECT * FROM {default} WHERE {created_at} >= %s AND {created_at} < %s",
+            [lower, upper]
+        )
+        cursor.execute(f"DELETE FROM {default} WHERE {created_at} >= %s AND {created_at} < %s", [lower, upper])
+        cursor.execute(f"ALTER TABLE {parent} ATTACH PARTITION {default} DEFAULT")
+
+
+def ensure_partitions(start=None, months_ahead=None):
+    """
+    Create every monthly partition from ``start`` (default: this month) through ``months_ahead``.
+    
+    Also creates the default partition, and the months of any rows that
+    landed in it.
+    """
+    if months_ahead is None:
+        months_ahead = settings.CONTACTS_INTERACTION_PARTITIONS_AHEAD
+    current = month_start(timezone.now())
+    month = month_start(start) if start else current
+    last = add_months(current, months_ahead)
+    
+    create_default_partition()
+    
+    existing = list_partitions()
+    months = []
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    months.extend(get_default_partition_months())
+    
+    created = []
+    for month in sorted(set(months)):
+        if month not in existing:
+            create_partition(month)
+            created.append(get_partition_name(month))
+    return created
+
+
+def drop_expired_partitions(retention_months=None):
+    """
+    Drop partitions entirely older than the retention window.
+    
+    A retention of 0 keeps everything. Returns the dropped table names.
+    """
+    if retention_months is None:
+        retention_months = settings.CONTACTS_INTERACTION_RETENTION_MONTHS
+    if not retention_months:
+        return []
+    
+    cutoff = add_months(month_start(timezone.now()), -retention_months)
+    qn = connection.ops.quote_name
+    dropped = []
+    for month, name in sorted(list_partitions().items()):
+        # Only drop when the partition's upper bound is at or before the cutoff
+        if add_months(month, 1) > cutoff:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {qn(PARENT_TABLE)} DETACH PARTITION {qn(name)}")
+            cursor.execute(f"DROP TABLE {qn(name)}")
+        dropped.append(name)
+    return dropped
+
+
+def convert_to_partitioned_table():
+    """
+    One-time conversion of ``contact_interactions`` into a partitioned table.
+    
+    The existing table is renamed, a partitioned parent with the same columns
+    is created, partitions covering the existing rows are added, the rows are
+    copied across and the old table is dropped. Foreign keys, model indexes
+    and model constraints are recreated on the parent, which propagates them
+    to partitions.
+    Runs in a single transaction; writes to the table block until it commits.
+    """
+    qn = connection.ops.quote_name
+    model = ContactInteraction
+    
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {qn(PARENT_TABLE)} IN ACCESS EXCLUSIVE MODE")
+            cursor.execute(f"ALTER TABLE {qn(PARENT_TABLE)} RENAME TO {qn(LEGACY_TABLE)}")
+            cursor.execute(
+                f"CREATE TABLE {qn(PARENT_TABLE)} (LIKE {qn(LEGACY_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                f"PARTITION BY RANGE ({qn('created_at')})"
+            )
+            cursor.execute(f"ALTER TABLE {qn(PARENT_TABLE)} ADD PRIMARY KEY ({qn('id')}, {qn('created_at')})")
+            cursor.execute(f"SELECT MIN({qn('created_at')}) FROM {qn(LEGACY_TABLE)}")
+            oldest = cursor.fetchone()[0]
+        
+        ensure_partitions(start=oldest)
+        
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {qn(PARENT_TABLE)} SELECT * FROM {qn(LEGACY_TABLE)}")
+            copied = cursor.rowcount
+            cursor.execute(f"DROP TABLE {qn(LEGACY_TABLE)}")
+            
+            for field in model._meta.concrete_fields:
+                if not field.remote_field:
+                    continue
+                target = field.remote_field.model._meta
+                cursor.execute(
+                    f"ALTER TABLE {qn(PARENT_TABLE)} ADD FOREIGN KEY ({qn(field.column)}) "
+                    f"REFERENCES {qn(target.db_table)} ({qn(field.target_field.column)}) "
+                    f"DEFERRABLE INITIALLY DEFERRED"
+                )
+                if field.db_index:
+                    cursor.execute(
+                        f"CREATE INDEX {qn(f'{PARENT_TABLE}_{field.column}_idx')} "
+                        f"ON {qn(PARENT_TABLE)} ({qn(field.column)})"
+                    )
+        
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for index in model._meta.indexes:
+                schema_editor.add_index(model, index)
+            for constraint in model._meta.constraints:
+                schema_editor.add_constraint(model, constraint)
+    
+    return copied
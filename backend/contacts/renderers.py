@@ -0,0 +1,31 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+    
+    Output matches ``JSONRenderer`` with its default compact settings for the
+    plain dicts produced by ``fastpath``, including the escaping of U+2028 and
+    U+2029. Types orjson doesn't know are handed to DRF's ``JSONEncoder``.
+    """
+    _fallback_encoder = JSONEncoder()
+    
+    @classmethod
+    def is_available(cls):
+        return orjson is not None
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        
+        ret = orjson.dumps(data, default=self._fallback_encoder.default)
+        
+        # Match JSONRenderer, which escapes these for use inside JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,102 @@
+"""
+Daily interaction rollups.
+
+``InteractionDailyRollup`` holds one row per (organizer, UTC day, interaction
+type) with the number of interactions recorded. Inserts increment it: single
+rows through the post_save signal, buffered batches in the same transaction
+as their ``bulk_create``. Stats and charts sum a few rollup rows instead of
+counting raw interactions.
+
+Rollups count interactions as recorded, so dropping partitions or archiving
+old rows leaves the history intact. ``rebuild_rollups`` recomputes a date
+range from the raw table when counts need repairing.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from .models import ContactInteraction, InteractionDailyRollup
+
+UPSERT_SQL = """
+    INSERT INTO contact_interaction_daily_rollups (organizer_id, day, interaction_type, count)
+    VALUES {values}
+    ON CONFLICT (organizer_id, day, interaction_type)
+    DO UPDATE SET count = contact_interaction_daily_rollups.count + EXCLUDED.count
+"""
+
+
+def get_rollup_key(interaction):
+    return (
+        interaction.organizer_id,
+        interaction.created_at.astimezone(dt_timezone.utc).date(),
+        interaction.interaction_type,
+    )
+
+
+def increment_rollups(interactions):
+    """Add ``interactions`` to their daily rollup rows."""
+    counts = Counter(get_rollup_key(interaction) for interaction in interactions)
+    if not counts:
+        return
+    
+    if connection.vendor == 'postgresql':
+        # One atomic upsert per call, safe against concurrent writers
+        params = []
+        for (organizer_id, day, interaction_type), count in sorted(counts.items(), key=str):
+            params.extend([organizer_id, day, interaction_type, count])
+        values = ', '.join(['(%s, %s, %s, %s)'] * len(counts))
+        with connection.cursor() as cursor:
+            cursor.execute(UPSERT_SQL.format(values=values), params)
+        return
+    
+    with transaction.atomic():
+        for (organizer_id, day, interaction_type), count in counts.items():
+            updated = InteractionDailyRollup.objects.filter(
+                organizer_id=organizer_id, day=day, interaction_type=interaction_type
+            ).update(count=F('count') + count)
+            if not updated:
+                InteractionDailyRollup.objects.create(
+                    organizer_id=organizer_id, day=day, interaction_type=interaction_type, count=count
+                )
+
+
+def rebuild_rollups(start_day, end_day, organizer_id=None):
+    """
+    Recompute rollups for ``[start_day, end_day]`` from raw interactions.
+    
+    Meant for closed days: increments racing with the rebuild of the current
+    day can be counted twice. Only run it over ranges whose raw rows still
+    exist, since dropped or archived days would be rebuilt as empty.
+    """
+    interactions = ContactInteraction.objects.filter(
+        created_at__gte=datetime.combine(start_day, time.min, tzinfo=dt_timezone.utc),
+        created_at__lt=datetime.combine(end_day + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+    )
+    rollups = InteractionDailyRollup.objects.filter(day__gte=start_day, day__lte=end_day)
+    if organizer_id:
+        interactions = interactions.filter(organizer_id=organizer_id)
+        rollups = rollups.filter(organizer_id=organizer_id)
+    
+    rows = (
+        interactions
+        .annotate(day=TruncDate('created_at', tzinfo=dt_timezone.utc))
+        .values('organizer_id', 'day', 'interaction_type')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    
+    with transaction.atomic():
+        rollups.delete()
+        InteractionDailyRollup.objects.bulk_create(
+            (InteractionDailyRollup(**row) for row in rows.iterator()),
+            batch_size=1000
+        )
+
+
+def get_interaction_count(organizer_id, since_day, interaction_type=None):
+    """Total interactions recorded from ``since_day`` (inclusive) onwards."""
+    rollups = InteractionDailyRollup.objects.filter(organizer_id=organizer_id, day__gte=since_day)
+    if interaction_type:
+        rollups = rollups.filter(interaction_type=interaction_type)
+    return rollups.aggregate(total=Sum('count'))['total'] or 0
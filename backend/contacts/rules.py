@@ -0,0 +1,223 @@
+"""
+Smart (rule-based) contact groups.
+
+A group with ``rules`` has its membership derived from them. Rules compile to a
+single ``Q`` predicate for full materialization, and to an equivalent Python
+check used to update one contact's memberships incrementally when it's saved.
+Membership lives in the regular ``ContactGroup.contacts`` table, so reads stay
+index lookups.
+
+Supported rule keys::
+
+    tags                     list of tags
+    tags_mode                'all' (default) or 'any'
+    company                  exact company name (case-insensitive)
+    is_active                bool
+    last_booking_after       ISO 8601 datetime (inclusive)
+    last_booking_before      ISO 8601 datetime (exclusive)
+    last_booking_within_days int, relative to now (refreshed daily)
+    min_total_bookings       int (inclusive)
+    max_total_bookings       int (inclusive)
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .bitmaps import rebuild_group_bitmap, update_group_bitmaps
+from .caching import bump_organizer_version
+from .models import Contact, ContactGroup
+
+RULE_KEYS = {
+    'tags', 'tags_mode', 'company', 'is_active', 'last_booking_after',
+    'last_booking_before', 'last_booking_within_days', 'min_total_bookings',
+    'max_total_bookings',
+}
+
+
+def validate_rules(rules):
+    """Return normalized rules, raising ValueError for anything unsupported."""
+    if not isinstance(rules, dict) or not rules:
+        raise ValueError('Rules must be a non-empty object.')
+    
+    unknown = set(rules) - RULE_KEYS
+    if unknown:
+        raise ValueError(f"Unsupported rule keys: {', '.join(sorted(unknown))}")
+    
+    normalized = dict(rules)
+    if 'tags' in rules:
+        if not isinstance(rules['tags'], list) or not all(isinstance(tag, str) for tag in rules['tags']):
+            raise ValueError('tags must be a list of strings.')
+        normalized['tags'] = [tag.strip() for tag in rules['tags'] if tag.strip()]
+    if rules.get('tags_mode', 'all') not in ('all', 'any'):
+        raise ValueError("tags_mode must be 'all' or 'any'.")
+    if 'company' in rules:
+        if not isinstance(rules['company'], str) or not rules['company'].strip():
+            raise ValueError('company must be a non-empty string.')
+        normalized['company'] = rules['company'].strip()
+    if 'is_active' in rules and not isinstance(rules['is_active'], bool):
+        raise ValueError('is_active must be a boolean.')
+    for key in ('last_booking_after', 'last_booking_before'):
+        if key in rules:
+            value = parse_datetime(str(rules[key]))
+            if value is None:
+                raise ValueError(f'{key} must be an ISO 8601 datetime.')
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            normalized[key] = value.isoformat()
+    for key in ('last_booking_within_days', 'min_total_bookings', 'max_total_bookings'):
+        # bool is an int subclass, so reject it explicitly
+        if key in rules and (not isinstance(rules[key], int) or isinstance(rules[key], bool) or rules[key] < 0):
+            raise ValueError(f'{key} must be a non-negative integer.')
+    
+    return normalized
+
+
+def _booking_window(rules):
+    after = parse_datetime(rules['last_booking_after']) if 'last_booking_after' in rules else None
+    before = parse_datetime(rules['last_booking_before']) if 'last_booking_before' in rules else None
+    if 'last_booking_within_days' in rules:
+        relative = timezone.now() - timedelta(days=rules['last_booking_within_days'])
+        after = max(after, relative) if after else relative
+    return after, before
+
+
+def compile_rules(rules):
+    """Compile rules into a single ``Q`` predicate over ``Contact``."""
+    predicate = Q()
+    
+    tags = rules.get('tags')
+    if tags:
+        if rules.get('tags_mode') == 'any':
+            tags_predicate = Q()
+            for tag in tags:
+                tags_predicate |= Q(tags__contains=[tag])
+            predicate &= tags_predicate
+        else:
+            predicate &= Q(tags__contains=tags)
+    
+    if 'company' in rules:
+        predicate &= Q(company__iexact=rules['company'])
+    if 'is_active' in rules:
+        predicate &= Q(is_active=rules['is_active'])
+    
+    after, before = _booking_window(rules)
+    if after:
+        predicate &= Q(last_booking_date__gte=after)
+    if before:
+        predicate &= Q(last_booking_date__lt=before)
+    
+    if 'min_total_bookings' in rules:
+        predicate &= Q(total_bookings__gte=rules['min_total_bookings'])
+    if 'max_total_bookings' in rules:
+        predicate &= Q(total_bookings__lte=rules['max_total_bookings'])
+    
+    return predicate
+
+
+def contact_matches_rules(contact, rules):
+    """Python equivalent of ``compile_rules`` for a single in-memory contact."""
+    tags = rules.get('tags')
+    if tags:
+        contact_tags = set(contact.tags or [])
+        if rules.get('tags_mode') == 'any':
+            if not contact_tags & set(tags):
+                return False
+        elif not set(tags) <= contact_tags:
+            return False
+    
+    if 'company' in rules and (contact.company or '').lower() != rules['company'].lower():
+        return False
+    if 'is_active' in rules and contact.is_active != rules['is_active']:
+        return False
+    
+    after, before = _booking_window(rules)
+    if (after or before) and contact.last_booking_date is None:
+        return False
+    if after and contact.last_booking_date < after:
+        return False
+    if before and contact.last_booking_date >= before:
+        return False
+    
+    if 'min_total_bookings' in rules and contact.total_bookings < rules['min_total_bookings']:
+        return False
+    if 'max_total_bookings' in rules and contact.total_bookings > rules['max_total_bookings']:
+        return False
+    
+    return True
+
+
+def materialize_smart_group(group):
+    """
+    Bring a smart group's stored membership in line with its rules.
+    
+    Only the difference is written: non-matching members are deleted and
+    missing matches inserted, then ``member_count`` is reset from the table.
+    Returns ``(added, removed)``.
+    """
+    Membership = ContactGroup.contacts.through
+    matching = Contact.objects.filter(organizer_id=group.organizer_id).filter(compile_rules(group.rules))
+    
+    with transaction.atomic():
+        memberships = Membership.objects.filter(contactgroup_id=group.id)
+        removed, _ = memberships.exclude(contact_id__in=matching.values('id')).delete()
+        
+        missing_ids = matching.exclude(groups=group).values_list('id', flat=True)
+        count_before = memberships.count()
+        Membership.objects.bulk_create(
+            (Membership(contactgroup_id=group.id, contact_id=contact_id) for contact_id in missing_ids.iterator()),
+            batch_size=settings.CONTACTS_BULK_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        member_count = memberships.count()
+        added = member_count - count_before
+        
+        ContactGroup.objects.filter(id=group.id).update(member_count=member_count)
+        if added or removed:
+            rebuild_group_bitmap(group.id)
+    
+    if added or removed:
+        bump_organizer_version(group.organizer_id)
+    
+    return added, removed
+
+
+def sync_contact_smart_groups(contact):
+    """Incrementally update one contact's smart group memberships after a write."""
+    smart_groups = list(
+        ContactGroup.objects.filter(organizer_id=contact.organizer_id, rules__isnull=False).only('id', 'rules')
+    )
+    if not smart_groups:
+        return
+    
+    Membership = ContactGroup.contacts.through
+    current = set(
+        Membership.objects.filter(
+            contact_id=contact.pk,
+            contactgroup_id__in=[group.id for group in smart_groups]
+        ).values_list('contactgroup_id', flat=True)
+    )
+    desired = {group.id for group in smart_groups if contact_matches_rules(contact, group.rules)}
+    
+    to_add = desired - current
+    to_remove = current - desired
+    if not to_add and not to_remove:
+        return
+    
+    with transaction.atomic():
+        if to_add:
+            Membership.objects.bulk_create(
+                [Membership(contactgroup_id=group_id, contact_id=contact.pk) for group_id in to_add],
+                ignore_conflicts=True
+            )
+            ContactGroup.objects.filter(id__in=to_add).update(member_count=F('member_count') + 1)
+            if contact.index_id is not None:
+                update_group_bitmaps(list(to_add), add=[contact.index_id])
+        if to_remove:
+            Membership.objects.filter(contact_id=contact.pk, contactgroup_id__in=to_remove).delete()
+            ContactGroup.objects.filter(id__in=to_remove).update(member_count=F('member_count') - 1)
+            if contact.index_id is not None:
+                update_group_bitmaps(list(to_remove), remove=[contact.index_id])
+    
+    bump_organizer_version(contact.organizer_id)
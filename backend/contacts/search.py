@@ -0,0 +1,124 @@
+"""
+Full-text and typeahead search helpers for contacts.
+
+Contacts carry a weighted ``tsvector`` (``Contact.search_vector``) backed by a
+GIN index, so the ``search`` query parameter is an index lookup rather than a
+sequential scan over four ``icontains`` filters. Typeahead suggestions use
+``pg_trgm`` GIN indexes on the name, email and company columns, each led by
+``organizer_id`` (via ``btree_gin``) so the organizer filter is applied inside
+the index scan instead of after matching every tenant's rows.
+"""
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+)
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+# The 'simple' configuration lowercases without stemming, which is what we want
+# for names, emails and company names.
+SEARCH_CONFIG = 'simple'
+
+# Fields that feed the search document; saves touching none of them skip the refresh.
+SEARCH_FIELDS = ('first_name', 'last_name', 'email', 'company', 'job_title', 'notes')
+
+CONTACT_SEARCH_VECTOR = (
+    SearchVector('first_name', 'last_name', weight='A', config=SEARCH_CONFIG) +
+    SearchVector('email', weight='A', config=SEARCH_CONFIG) +
+    SearchVector('company', 'job_title', weight='B', config=SEARCH_CONFIG) +
+    SearchVector('notes', weight='D', config=SEARCH_CONFIG)
+)
+
+# Characters that are safe to pass through to to_tsquery() as part of a term.
+SEARCH_TERM_RE = re.compile(r'[\w@.]+')
+
+
+def build_prefix_query(search):
+    """
+    Build a raw tsquery matching every term of ``search`` as a prefix.
+    
+    Returns None when the input contains no searchable terms.
+    """
+    terms = [term.strip('.') for term in SEARCH_TERM_RE.findall(search.lower())]
+    terms = [term for term in terms if term]
+    if not terms:
+        return None
+    
+    return SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms),
+        search_type='raw',
+        config=SEARCH_CONFIG
+    )
+
+
+def apply_contact_search(queryset, search):
+    """
+    Filter ``queryset`` to contacts matching ``search``, best matches first.
+    
+    Falls back to the legacy ``icontains`` filters on non-PostgreSQL databases.
+    """
+    if connection.vendor != 'postgresql':
+        return queryset.filter(
+            Q(first_name__icontains=search) |
+            Q(last_name__icontains=search) |
+            Q(email__icontains=search) |
+            Q(company__icontains=search)
+        ).order_by('first_name', 'last_name')
+    
+    query = build_prefix_query(search)
+    if query is None:
+        return queryset.none()
+    
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    ).order_by('-search_rank', 'first_name', 'last_name')
+
+
+def suggest_contacts(queryset, term, limit):
+    """
+    Return up to ``limit`` ``(id, first_name, last_name, email)`` rows for typeahead.
+    
+    Rows are ordered by trigram word similarity to ``term`` on PostgreSQL and
+    alphabetically elsewhere.
+    """
+    columns = ('id', 'first_name', 'last_name', 'email')
+    
+    if connection.vendor != 'postgresql':
+        return list(
+            queryset.filter(
+                Q(first_name__istartswith=term) |
+                Q(last_name__istartswith=term) |
+                Q(email__istartswith=term) |
+                Q(company__istartswith=term)
+            ).order_by('first_name', 'last_name').values_list(*columns)[:limit]
+        )
+    
+    return list(
+        queryset.filter(
+            Q(first_name__trigram_word_similar=term) |
+            Q(last_name__trigram_word_similar=term) |
+            Q(email__trigram_word_similar=term) |
+            Q(company__trigram_word_similar=term)
+        ).annotate(
+            similarity=Greatest(
+                TrigramWordSimilarity(term, 'first_name'),
+                TrigramWordSimilarity(term, 'last_name'),
+                TrigramWordSimilarity(term, 'email'),
+                TrigramWordSimilarity(term, 'company'),
+            )
+        ).order_by('-similarity', 'first_name', 'last_name').values_list(*columns)[:limit]
+    )
+
+
+def update_search_vectors(queryset):
+    """Recompute the search document for every contact in ``queryset``."""
+    if connection.vendor != 'postgresql':
+        return 0
+    return queryset.update(search_vector=CONTACT_SEARCH_VECTOR)
+
+
+def assign_missing_search_vectors(queryset):
+    """Backfill the search document for contacts in ``queryset`` that don't have one."""
+    return update_search_vectors(queryset.filter(search_vector__isnull=True))
@@ -1,10 +1,29 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Contact, ContactGroup, ContactInteraction
+from .fieldsets import SparseFieldsetSerializerMixin
+from .rules import validate_rules as validate_group_rules
+from .trends import MAX_BUCKETS, get_bucket_starts
 
 
-class ContactSerializer(serializers.ModelSerializer):
+class ContactGroupRulesMixin:
+    """Validate smart group rules; null means a manually managed group."""
+    
+    def validate_rules(self, value):
+        if value is None:
+            return None
+        try:
+            return validate_group_rules(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+
+class ContactSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
-    groups_count = serializers.IntegerField(source='groups.count', read_only=True)
+    # Annotated by Contact.objects.with_groups_count() to avoid a COUNT per row
+    groups_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Contact
@@ -26,20 +45,35 @@ class ContactCreateSerializer(serializers.ModelSerializer):
         ]
 
 
-class ContactGroupSerializer(serializers.ModelSerializer):
+class ContactGroupSerializer(ContactGroupRulesMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     contact_count = serializers.ReadOnlyField()
+    is_smart = serializers.ReadOnlyField()
     contacts = ContactSerializer(many=True, read_only=True)
     
     class Meta:
         model = ContactGroup
         fields = [
-            'id', 'name', 'description', 'color', 'contact_count',
-            'contacts', 'created_at', 'updated_at'
+            'id', 'name', 'description', 'color', 'contact_count', 'rules',
+            'is_smart', 'contacts', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class ContactGroupCreateSerializer(serializers.ModelSerializer):
+class ContactGroupListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Lightweight group listing: member counts only, members are paged separately."""
+    contact_count = serializers.IntegerField(source='member_count', read_only=True)
+    is_smart = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = ContactGroup
+        fields = [
+            'id', 'name', 'description', 'color', 'contact_count', 'rules',
+            'is_smart', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class ContactGroupCreateSerializer(ContactGroupRulesMixin, serializers.ModelSerializer):
     contact_ids = serializers.ListField(
         child=serializers.UUIDField(),
         write_only=True,
@@ -48,7 +82,12 @@ class ContactGroupCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ContactGroup
-        fields = ['name', 'description', 'color', 'contact_ids']
+        fields = ['name', 'description', 'color', 'rules', 'contact_ids']
+    
+    def validate(self, attrs):
+        if attrs.get('rules') is not None and attrs.get('contact_ids'):
+            raise serializers.ValidationError('Smart groups take rules or contact_ids, not both.')
+        return attrs
     
     def create(self, validated_data):
         contact_ids = validated_data.pop('contact_ids', [])
@@ -64,7 +103,7 @@ class ContactGroupCreateSerializer(serializers.ModelSerializer):
         return group
 
 
-class ContactInteractionSerializer(serializers.ModelSerializer):
+class ContactInteractionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     interaction_type_display = serializers.CharField(source='get_interaction_type_display', read_only=True)
     contact_name = serializers.CharField(source='contact.full_name', read_only=True)
     contact_id = serializers.UUIDField(source='contact.id', read_only=True)
@@ -79,6 +118,13 @@ class ContactInteractionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class ContactInteractionCreateSerializer(serializers.Serializer):
+    """Serializer for recording an interaction; validated before it is buffered."""
+    interaction_type = serializers.ChoiceField(choices=ContactInteraction.INTERACTION_TYPES, default='manual_entry')
+    description = serializers.CharField(allow_blank=True, default='')
+    metadata = serializers.DictField(default=dict)
+
+
 class ContactStatsSerializer(serializers.Serializer):
     """Serializer for contact statistics."""
     total_contacts = serializers.IntegerField()
@@ -89,6 +135,84 @@ class ContactStatsSerializer(serializers.Serializer):
     booking_frequency = serializers.DictField()
 
 
+class ContactFilterSerializer(serializers.Serializer):
+    """Contact list filters for bulk operations; unknown keys are rejected rather than ignored."""
+    search = serializers.CharField(required=False)
+    tags = serializers.ListField(child=serializers.CharField(), required=False, allow_empty=False)
+    tags_mode = serializers.ChoiceField(choices=['all', 'any'], required=False)
+    is_active = serializers.BooleanField(required=False)
+    group = serializers.UUIDField(required=False)
+    
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            unknown = set(data) - set(self.fields)
+            if unknown:
+                raise serializers.ValidationError(f"Unsupported filter keys: {', '.join(sorted(unknown))}")
+        return super().to_internal_value(data)
+    
+    def validate(self, attrs):
+        # An empty filter would match every contact of the organizer
+        if not set(attrs) - {'tags_mode'}:
+            raise serializers.ValidationError('Provide at least one of search, tags, is_active or group.')
+        return attrs
+
+
+class BulkGroupMembershipSerializer(serializers.Serializer):
+    """Serializer for bulk adding/removing group members by ids or contact filter."""
+    action = serializers.ChoiceField(choices=['add', 'remove'])
+    contact_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        max_length=settings.CONTACTS_BULK_MEMBERSHIP_MAX_IDS
+    )
+    filter = ContactFilterSerializer(required=False)
+    
+    def validate(self, attrs):
+        if ('contact_ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide exactly one of contact_ids or filter.')
+        return attrs
+
+
+class GroupSetQuerySerializer(serializers.Serializer):
+    """Serializer for group set algebra: (all) & (any) minus (none)."""
+    all = serializers.ListField(child=serializers.UUIDField(), required=False)
+    any = serializers.ListField(child=serializers.UUIDField(), required=False)
+    none = serializers.ListField(child=serializers.UUIDField(), required=False)
+    overlaps = serializers.BooleanField(default=False)
+    contacts_limit = serializers.IntegerField(default=0, min_value=0, max_value=100)
+    
+    def validate(self, attrs):
+        if not attrs.get('all') and not attrs.get('any'):
+            raise serializers.ValidationError('Provide at least one group in all or any.')
+        return attrs
+
+
+class TrendQuerySerializer(serializers.Serializer):
+    """Query parameters for the contact trends endpoint."""
+    metric = serializers.ChoiceField(choices=['contacts_created', 'contacts_booked'], default='contacts_created')
+    granularity = serializers.ChoiceField(choices=['day', 'week', 'month'], default='day')
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    
+    def validate(self, attrs):
+        end = attrs.get('end') or timezone.now().date()
+        start = attrs.get('start')
+        if start is None:
+            start = {
+                'day': end - timedelta(days=29),
+                'week': end - timedelta(weeks=11),
+                'month': (end.replace(day=1) - timedelta(days=335)).replace(day=1),
+            }[attrs['granularity']]
+        if start > end:
+            raise serializers.ValidationError('start must not be after end.')
+        if len(get_bucket_starts(start, end, attrs['granularity'])) > MAX_BUCKETS:
+            raise serializers.ValidationError(f'Requested range exceeds {MAX_BUCKETS} buckets.')
+        attrs['start'] = start
+        attrs['end'] = end
+        return attrs
+
+
 class ContactImportSerializer(serializers.Serializer):
     """Serializer for importing contacts."""
     csv_file = serializers.FileField()
@@ -0,0 +1,214 @@
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from .models import Contact, ContactGroup, ContactInteraction
+from .bitmaps import allocate_index_ids, get_contact_index_ids, rebuild_group_bitmap, update_group_bitmaps
+from .caching import bump_organizer_version
+from .rollups import increment_rollups
+from .rules import sync_contact_smart_groups
+from .search import SEARCH_FIELDS, update_search_vectors
+from .stats import apply_stats_delta, mark_stats_dirty
+from .trends import bump_trends_generation, has_closed_bookings
+from .utils import invalidate_tag_facets
+
+
+@receiver(post_save, sender=Contact)
+def refresh_contact_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the contact's full-text search document in sync with its fields."""
+    if update_fields and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    
+    update_search_vectors(Contact.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+def invalidate_contact_tag_facets(sender, instance, **kwargs):
+    """Drop the organizer's cached tag counts when a contact changes."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and 'tags' not in update_fields:
+        return
+    
+    invalidate_tag_facets(instance.organizer_id)
+
+
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+@receiver(post_save, sender=ContactGroup)
+@receiver(post_delete, sender=ContactGroup)
+@receiver(post_save, sender=ContactInteraction)
+def bump_contacts_version(sender, instance, **kwargs):
+    """
+    Invalidate the organizer's cached responses and conditional GET validators on any write.
+    
+    Interactions are only deleted with their contact (whose delete bumps the
+    version once), and a ContactInteraction delete receiver would turn off
+    fast deletes, loading and signalling every interaction row.
+    """
+    bump_organizer_version(instance.organizer_id)
+
+
+@receiver(m2m_changed, sender=ContactGroup.contacts.through)
+def bump_contacts_version_on_membership_change(sender, instance, action, **kwargs):
+    """Group membership changes alter group payloads and contacts' groups_count."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_organizer_version(instance.organizer_id)
+
+
+@receiver(m2m_changed, sender=ContactGroup.contacts.through)
+def maintain_group_member_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep ``ContactGroup.member_count`` in step with membership changes.
+    
+    ``pk_set`` on post_add only holds newly added rows, but on removal it holds
+    whatever was requested, so existing memberships are captured in the pre_*
+    step and applied after the write.
+    """
+    Membership = ContactGroup.contacts.through
+    
+    if not reverse:
+        # instance is a ContactGroup, pk_set holds contact ids
+        groups = ContactGroup.objects.filter(pk=instance.pk)
+        if action == 'post_add' and pk_set:
+            groups.update(member_count=F('member_count') + len(pk_set))
+        elif action == 'pre_remove':
+            instance._removed_member_count = Membership.objects.filter(
+                contactgroup_id=instance.pk, contact_id__in=pk_set
+            ).count()
+        elif action == 'post_remove':
+            removed = getattr(instance, '_removed_member_count', 0)
+            if removed:
+                groups.update(member_count=F('member_count') - removed)
+        elif action == 'post_clear':
+            groups.update(member_count=0)
+        return
+    
+    # instance is a Contact, pk_set holds group ids
+    if action == 'post_add' and pk_set:
+        ContactGroup.objects.filter(pk__in=pk_set).update(member_count=F('member_count') + 1)
+    elif action in ('pre_remove', 'pre_clear'):
+        memberships = Membership.objects.filter(contact_id=instance.pk)
+        if action == 'pre_remove':
+            memberships = memberships.filter(contactgroup_id__in=pk_set)
+        instance._removed_group_ids = list(memberships.values_list('contactgroup_id', flat=True))
+    elif action in ('post_remove', 'post_clear'):
+        group_ids = getattr(instance, '_removed_group_ids', [])
+        if group_ids:
+            ContactGroup.objects.filter(pk__in=group_ids).update(member_count=F('member_count') - 1)
+
+
+@receiver(pre_delete, sender=Contact)
+def decrement_group_member_counts(sender, instance, **kwargs):
+    """Deleting a contact cascades to its memberships without m2m_changed."""
+    ContactGroup.objects.filter(contacts=instance).update(member_count=F('member_count') - 1)
+
+
+@receiver(post_save, sender=Contact)
+def update_smart_group_memberships(sender, instance, **kwargs):
+    """Re-evaluate the organizer's smart group rules against the saved contact."""
+    sync_contact_smart_groups(instance)
+
+
+@receiver(pre_save, sender=Contact)
+def assign_contact_index_id(sender, instance, **kwargs):
+    """Give new contacts their compact per-organizer bitmap position."""
+    if instance._state.adding and instance.index_id is None:
+        instance.index_id = allocate_index_ids(instance.organizer_id)[0]
+
+
+@receiver(m2m_changed, sender=ContactGroup.contacts.through)
+def maintain_group_bitmaps(sender, instance, action, reverse, pk_set, **kwargs):
+    """Mirror membership changes into the groups' bitmaps."""
+    if not reverse:
+        # instance is a ContactGroup, pk_set holds contact ids
+        if action == 'post_add' and pk_set:
+            update_group_bitmaps([instance.pk], add=get_contact_index_ids(pk_set))
+        elif action == 'post_remove' and pk_set:
+            update_group_bitmaps([instance.pk], remove=get_contact_index_ids(pk_set))
+        elif action == 'post_clear':
+            rebuild_group_bitmap(instance.pk)
+        return
+    
+    # instance is a Contact, pk_set holds group ids
+    if instance.index_id is None:
+        return
+    if action == 'post_add' and pk_set:
+        update_group_bitmaps(list(pk_set), add=[instance.index_id])
+    elif action == 'post_remove' and pk_set:
+        update_group_bitmaps(list(pk_set), remove=[instance.index_id])
+    elif action == 'pre_clear':
+        instance._cleared_bitmap_group_ids = list(
+            ContactGroup.contacts.through.objects.filter(contact_id=instance.pk).values_list('contactgroup_id', flat=True)
+        )
+    elif action == 'post_clear':
+        update_group_bitmaps(getattr(instance, '_cleared_bitmap_group_ids', []), remove=[instance.index_id])
+
+
+@receiver(pre_delete, sender=Contact)
+def remove_contact_from_group_bitmaps(sender, instance, **kwargs):
+    if instance.index_id is None:
+        return
+    group_ids = list(ContactGroup.objects.filter(contacts=instance).values_list('id', flat=True))
+    update_group_bitmaps(group_ids, remove=[instance.index_id])
+
+
+@receiver(post_save, sender=ContactInteraction)
+def count_interaction_in_rollup(sender, instance, created, **kwargs):
+    if created:
+        increment_rollups([instance])
+
+
+@receiver(post_save, sender=Contact)
+def update_contact_stats_on_save(sender, instance, created, **kwargs):
+    if created:
+        apply_stats_delta(instance.organizer_id, total_contacts=1, active_contacts=int(instance.is_active))
+    # Company, activity and booking changes are left to the debounced recompute
+    mark_stats_dirty(instance.organizer_id)
+
+
+@receiver(post_delete, sender=Contact)
+def update_contact_stats_on_delete(sender, instance, **kwargs):
+    apply_stats_delta(instance.organizer_id, total_contacts=-1, active_contacts=-int(instance.is_active))
+    mark_stats_dirty(instance.organizer_id)
+
+
+@receiver(post_save, sender=ContactGroup)
+def update_group_stats_on_save(sender, instance, created, **kwargs):
+    if created:
+        apply_stats_delta(instance.organizer_id, total_groups=1)
+
+
+@receiver(post_delete, sender=ContactGroup)
+def update_group_stats_on_delete(sender, instance, **kwargs):
+    apply_stats_delta(instance.organizer_id, total_groups=-1)
+
+
+@receiver(post_save, sender=ContactInteraction)
+def update_interaction_stats_on_save(sender, instance, created, **kwargs):
+    if created:
+        apply_stats_delta(instance.organizer_id, recent_interactions=1)
+
+
+@receiver(post_save, sender=Contact)
+def invalidate_booked_trends(sender, instance, created, update_fields=None, **kwargs):
+    """contacts_booked matches bookings by contact email, so new contacts and email changes can alter closed buckets."""
+    if 'email' not in instance.__dict__ or (update_fields is not None and 'email' not in update_fields):
+        return
+    emails = {instance.email}
+    if not created:
+        loaded_email = getattr(instance, '_loaded_email', None)
+        if loaded_email == instance.email:
+            return
+        if loaded_email:
+            emails.add(loaded_email)
+    instance._loaded_email = instance.email
+    
+    if has_closed_bookings(instance.organizer_id, emails):
+        bump_trends_generation(instance.organizer_id)
+
+
+@receiver(post_delete, sender=Contact)
+@receiver(post_delete, sender='events.Booking')
+def invalidate_contact_trends(sender, instance, **kwargs):
+    """Deletes can lower closed trend buckets, which are otherwise cached for weeks."""
+    bump_trends_generation(instance.organizer_id)
@@ -0,0 +1,134 @@
+"""
+Request coalescing and stale-while-revalidate for expensive contact computations.
+
+``coalesce`` lets one caller compute a value under a cache lock (a lease that
+expires on its own if the holder dies) while concurrent callers wait for it
+and reuse the result. ``SingleFlight`` builds cached values on top of it: a
+fresh value is returned as is, a stale one is returned immediately while a
+single background task recomputes it, and a missing one is computed once for
+all concurrent requests.
+"""
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+
+POLL_INTERVAL = 0.05
+
+
+def acquire_lock(lock_key, timeout=None):
+    """Take the lease on ``lock_key``; returns a token, or None if someone else holds it."""
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, timeout or settings.CONTACTS_SINGLE_FLIGHT_LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def release_lock(lock_key, token=None):
+    # Don't release a lease that expired and was taken over by another caller
+    if token is None or cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def coalesce(lock_key, compute, reload, wait_timeout=None):
+    """
+    Run ``compute`` in one caller at a time for ``lock_key``.
+    
+    Callers that find the lock held poll ``reload`` until it returns a
+    non-None result or the lock is released, and only compute themselves if
+    neither happens within ``wait_timeout`` seconds.
+    """
+    token = acquire_lock(lock_key)
+    if token is None:
+        deadline = time.monotonic() + (wait_timeout or settings.CONTACTS_SINGLE_FLIGHT_WAIT_TIMEOUT)
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            result = reload()
+            if result is not None:
+                return result
+            if cache.get(lock_key) is None:
+                token = acquire_lock(lock_key)
+                break
+    
+    try:
+        return compute()
+    finally:
+        if token is not None:
+            release_lock(lock_key, token)
+
+
+class SingleFlight:
+    """
+    A cached computation keyed by its arguments, with coalescing and stale-while-revalidate.
+    
+    Values are fresh for ``fresh_timeout`` seconds and then served stale for
+    up to ``stale_timeout`` more while ``refresh_single_flight`` recomputes
+    them. Background refreshes pass the arguments to Celery as strings, so
+    ``compute`` must accept them in that form (ids, versions).
+    """
+    registry = {}
+    
+    def __init__(self, name, compute, fresh_timeout, stale_timeout=0):
+        self.name = name
+        self.compute = compute
+        self.fresh_timeout = fresh_timeout
+        self.stale_timeout = stale_timeout
+        self.registry[name] = self
+    
+    def get_cache_key(self, *args):
+        return ':'.join(['contacts:single_flight', self.name, *(str(arg) for arg in args)])
+    
+    def get_lock_key(self, *args):
+        return f"{self.get_cache_key(*args)}:lock"
+    
+    def _load(self, *args):
+        entry = cache.get(self.get_cache_key(*args))
+        return entry['value'] if entry is not None else None
+    
+    def _store(self, args, value):
+        entry = {'value': value, 'fresh_until': time.time() + self.fresh_timeout}
+        cache.set(self.get_cache_key(*args), entry, self.fresh_timeout + self.stale_timeout)
+        return value
+    
+    def get(self, *args):
+        entry = cache.get(self.get_cache_key(*args))
+        if entry is not None:
+            if entry['fresh_until'] <= time.time():
+                self._schedule_refresh(args)
+            return entry['value']
+        
+        return coalesce(
+            self.get_lock_key(*args),
+            lambda: self._store(args, self.compute(*args)),
+            lambda: self._load(*args)
+        )
+    
+    def _schedule_refresh(self, args):
+        lock_key = self.get_lock_key(*args)
+        token = acquire_lock(lock_key)
+        if token is None:
+            # A refresh is already running
+            return
+        try:
+            from .tasks import refresh_single_flight
+            refresh_single_flight.delay(self.name, [str(arg) for arg in args], token)
+        except Exception:
+            release_lock(lock_key, token)
+    
+    def refresh(self, args, token=None):
+        """Recompute and store the value; releases the refresh lease when given its token."""
+        try:
+            return self._store(args, self.compute(*args))
+        finally:
+            if token is not None:
+                release_lock(self.get_lock_key(*args), token)
+    
+    def expire(self, *args):
+        """Mark the value stale so the next read serves it while refreshing."""
+        key = self.get_cache_key(*args)
+        entry = cache.get(key)
+        if entry is not None and self.stale_timeout:
+            entry['fresh_until'] = 0
+            cache.set(key, entry, self.stale_timeout)
+        else:
+            cache.delete(key)
@@ -0,0 +1,149 @@
+"""
+Contact statistics for the dashboard.
+
+``compute_contact_stats`` reads every contact-level metric in one pass over
+the organizer's contacts, using conditional aggregates instead of a separate
+``COUNT`` per metric.
+
+Its result is kept in a ``ContactStatsSnapshot`` row per organizer, so the
+stats endpoint is a primary-key read. Creates and deletes apply exact deltas
+to the counters; other writes mark the snapshot dirty, and the
+``process_dirty_contact_stats`` task recomputes snapshots that have been
+dirty for ``CONTACTS_STATS_DEBOUNCE_SECONDS``, so a burst of writes costs one
+recompute. Snapshots computed on an earlier day are also refreshed, since
+the booking and interaction windows roll over.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from .models import Contact, ContactGroup, ContactStatsSnapshot
+from .rollups import get_interaction_count
+from .singleflight import coalesce
+
+COMPUTED_AT_CACHE_TIMEOUT = 86400
+
+SNAPSHOT_FIELDS = (
+    'total_contacts', 'active_contacts', 'total_groups', 'recent_interactions',
+    'top_companies', 'booking_frequency',
+)
+
+
+def compute_contact_stats(organizer_id):
+    """Return the ``ContactStatsSerializer`` payload for an organizer."""
+    now = timezone.now()
+    month_ago = now - timedelta(days=30)
+    two_months_ago = now - timedelta(days=60)
+    year_ago = now - timedelta(days=365)
+    
+    contacts = Contact.objects.filter(organizer_id=organizer_id)
+    totals = contacts.aggregate(
+        total_contacts=Count('id'),
+        active_contacts=Count('id', filter=Q(is_active=True)),
+        this_month=Count('id', filter=Q(last_booking_date__gte=month_ago)),
+        last_month=Count('id', filter=Q(last_booking_date__gte=two_months_ago, last_booking_date__lt=month_ago)),
+        this_year=Count('id', filter=Q(last_booking_date__gte=year_ago)),
+    )
+    
+    top_companies = list(
+        contacts.exclude(company='')
+        .values('company')
+        .annotate(count=Count('id'))
+        .order_by('-count')[:5]
+    )
+    
+    return {
+        'total_contacts': totals['total_contacts'],
+        'active_contacts': totals['active_contacts'],
+        # Index-only lookups: the (organizer, name) unique index and a few rollup rows
+        'total_groups': ContactGroup.objects.filter(organizer_id=organizer_id).count(),
+        'recent_interactions': get_interaction_count(organizer_id, month_ago.date()),
+        'top_companies': top_companies,
+        'booking_frequency': {
+            'this_month': totals['this_month'],
+            'last_month': totals['last_month'],
+            'this_year': totals['this_year'],
+        },
+    }
+
+
+def get_dirty_cache_key(organizer_id):
+    return f"contacts:stats:dirty:{organizer_id}"
+
+
+def get_computed_cache_key(organizer_id):
+    return f"contacts:stats:computed_at:{organizer_id}"
+
+
+def refresh_stats_snapshot(organizer_id):
+    """Recompute and store an organizer's snapshot."""
+    # Clear the flag before reading, so writes racing with the recompute mark it again
+    cache.delete(get_dirty_cache_key(organizer_id))
+    ContactStatsSnapshot.objects.filter(organizer_id=organizer_id).update(is_dirty=False, dirty_since=None)
+    
+    stats = compute_contact_stats(organizer_id)
+    snapshot, _ = ContactStatsSnapshot.objects.update_or_create(
+        organizer_id=organizer_id,
+        defaults={**stats, 'computed_at': timezone.now()}
+    )
+    cache.set(get_computed_cache_key(organizer_id), snapshot.computed_at.timestamp(), COMPUTED_AT_CACHE_TIMEOUT)
+    return snapshot
+
+
+def get_stats_computed_at(organizer_id):
+    """
+    Timestamp of the organizer's snapshot (0 before the first one), for validators.
+    
+    Recomputes change the stats payload without bumping the organizer
+    version, so the stats endpoint mixes this into its ETag and Last-Modified
+    rather than retiring every cached contact and group response.
+    """
+    key = get_computed_cache_key(organizer_id)
+    computed_at = cache.get(key)
+    if computed_at is None:
+        snapshot_computed_at = ContactStatsSnapshot.objects.filter(
+            organizer_id=organizer_id
+        ).values_list('computed_at', flat=True).first()
+        computed_at = snapshot_computed_at.timestamp() if snapshot_computed_at else 0
+        cache.set(key, computed_at, COMPUTED_AT_CACHE_TIMEOUT)
+    return computed_at
+
+
+def get_contact_stats(organizer_id):
+    """Stats payload from the organizer's snapshot, computing it on first use."""
+    snapshot = ContactStatsSnapshot.objects.filter(organizer_id=organizer_id).first()
+    if snapshot is None:
+        # Concurrent first requests wait for a single computation
+        snapshot = coalesce(
+            f"contacts:stats:compute:{organizer_id}",
+            lambda: refresh_stats_snapshot(organizer_id),
+            lambda: ContactStatsSnapshot.objects.filter(organizer_id=organizer_id).first()
+        )
+    elif snapshot.computed_at.date() < timezone.now().date():
+        mark_stats_dirty(organizer_id)
+    return {field: getattr(snapshot, field) for field in SNAPSHOT_FIELDS}
+
+
+def mark_stats_dirty(organizer_id):
+    """Flag the snapshot for the debounced recompute; repeat calls within the window are free."""
+    if not cache.add(get_dirty_cache_key(organizer_id), 1, settings.CONTACTS_STATS_DEBOUNCE_SECONDS):
+        return
+    ContactStatsSnapshot.objects.filter(organizer_id=organizer_id, is_dirty=False).update(
+        is_dirty=True, dirty_since=timezone.now()
+    )
+
+
+def apply_stats_delta(organizer_id, **deltas):
+    """Apply exact counter changes (e.g. ``total_contacts=1``) to the snapshot, if it exists."""
+    deltas = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if deltas:
+        ContactStatsSnapshot.objects.filter(organizer_id=organizer_id).update(**deltas)
+
+
+def get_due_dirty_snapshots():
+    """Organizer ids whose snapshots have been dirty for at least the debounce window."""
+    cutoff = timezone.now() - timedelta(seconds=settings.CONTACTS_STATS_DEBOUNCE_SECONDS)
+    return ContactStatsSnapshot.objects.filter(
+        is_dirty=True, dirty_since__lte=cutoff
+    ).values_list('organizer_id', flat=True)
@@ -0,0 +1,19 @@
+"""
+Private storage for contact data at rest.
+
+Archived interactions and contact exports hold PII, so they are kept out of
+``MEDIA_ROOT``, which is served as user media. ``private_storage`` is a
+file system storage rooted at ``CONTACTS_PRIVATE_STORAGE_ROOT``; files in it
+are only ever read back by the application.
+"""
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import LazyObject
+
+
+class PrivateStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = FileSystemStorage(location=settings.CONTACTS_PRIVATE_STORAGE_ROOT)
+
+
+private_storage = PrivateStorage()
@@ -1,6 +1,9 @@
 from celery import shared_task
 from django.utils import timezone
+from django.db.models import F
 from .models import Contact, ContactInteraction
+from .buffer import record_interaction
+import codecs
 import csv
 import io
 import logging
@@ -8,33 +11,74 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+MAX_IMPORT_ERRORS = 10
+
+
+def iter_csv_lines(file, chunk_size=64 * 1024):
+    """
+    Decode a stored file into lines incrementally, for ``csv.reader``.
+    
+    Only one chunk and one partial line are held in memory regardless of the
+    file's size. Line endings are kept so quoted multi-line fields still parse.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    for chunk in file.chunks(chunk_size):
+        pending += decoder.decode(chunk)
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
 @shared_task
-def process_contact_import(organizer_id, csv_content, skip_duplicates=True, update_existing=False):
-    """Process contact import from CSV."""
+def process_contact_import(organizer_id, file_path=None, skip_duplicates=True, update_existing=False,
+                           csv_content=None):
+    """
+    Process contact import from a CSV spooled to storage at ``file_path``.
+    
+    The file is parsed as a stream and deleted afterwards. ``csv_content`` is
+    still accepted for imports queued before uploads were spooled.
+    """
+    from django.core.files.storage import default_storage
+    
+    csv_file = None
     try:
         from apps.users.models import User
         organizer = User.objects.get(id=organizer_id)
         
         # Parse CSV
-        csv_file = io.StringIO(csv_content)
-        reader = csv.DictReader(csv_file)
+        if file_path:
+            csv_file = default_storage.open(file_path, 'rb')
+            reader = csv.DictReader(iter_csv_lines(csv_file))
+        else:
+            reader = csv.DictReader(io.StringIO(csv_content))
         
         created_count = 0
         updated_count = 0
         skipped_count = 0
+        error_count = 0
         errors = []
         
-        for row in reader:
+        # Row 1 is the header
+        for row_num, row in enumerate(reader, start=2):
             try:
                 email = row.get('email', '').strip().lower()
                 if not email:
-                    errors.append(f"Row {row_num}: Email is required")
+                    error_count += 1
+                    if len(errors) < MAX_IMPORT_ERRORS:
+                        errors.append(f"Row {row_num}: Email is required")
                     skipped_count += 1
                     continue
                 
                 # Basic email validation
                 if '@' not in email or '.' not in email.split('@')[-1]:
-                    errors.append(f"Row {row_num}: Invalid email format: {email}")
+                    error_count += 1
+                    if len(errors) < MAX_IMPORT_ERRORS:
+                        errors.append(f"Row {row_num}: Invalid email format: {email}")
                     skipped_count += 1
                     continue
                 
@@ -84,7 +128,9 @@ def process_contact_import(organizer_id, csv_content, skip_duplicates=True, upda
                     created_count += 1
             except Exception as e:
                 logger.error(f"Error processing row {row_num}: {str(e)}")
-                errors.append(f"Row {row_num}: {str(e)}")
+                error_count += 1
+                if len(errors) < MAX_IMPORT_ERRORS:
+                    errors.append(f"Row {row_num}: {str(e)}")
                 skipped_count += 1
         
         result = {
@@ -93,12 +139,12 @@ def process_contact_import(organizer_id, csv_content, skip_duplicates=True, upda
             'created_count': created_count,
             'updated_count': updated_count,
             'skipped_count': skipped_count,
-            'errors': errors[:10]  # Limit to first 10 errors
+            'errors': errors  # Limited to the first MAX_IMPORT_ERRORS errors
         }
         
-        if errors:
+        if error_count:
             result['status'] = 'partial_success'
-            result['message'] += f" with {len(errors)} errors"
+            result['message'] += f" with {error_count} errors"
         
         return result
     
@@ -113,6 +159,11 @@ def process_contact_import(organizer_id, csv_content, skip_duplicates=True, upda
             'status': 'error',
             'message': f"Error importing contacts: {str(e)}"
         }
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        if file_path:
+            default_storage.delete(file_path)
 
 
 @shared_task
@@ -158,6 +209,12 @@ def merge_contact_data(primary_contact_id, duplicate_contact_ids):
             primary_contact.last_booking_date = latest_booking_date
         primary_contact.save()
         
+        # Move archived history too; rows of deleted contacts would be dropped
+        from .archive import reassign_archived_contacts
+        reassign_archived_contacts(
+            primary_contact.organizer_id, [duplicate.id for duplicate in duplicate_contacts], primary_contact
+        )
+        
         # Delete duplicate contacts
         duplicate_contacts.delete()
         
@@ -294,7 +351,7 @@ def create_contact_from_booking(booking_id):
         contact.save()
         
         # Create interaction record
-        ContactInteraction.objects.create(
+        record_interaction(
             contact=contact,
             organizer=booking.organizer,
             interaction_type='booking_created',
@@ -304,7 +361,9 @@ def create_contact_from_booking(booking_id):
                 'event_type': booking.event_type.name,
                 'duration': booking.event_type.duration,
                 'start_time': booking.start_time.isoformat()
-            }
+            },
+            idempotency_key=f"booking:{booking.id}:booking_created",
+            created_at=booking.created_at
         )
         
         action = "Created" if created else "Updated"
@@ -324,4 +383,278 @@ def create_contact_from_booking(booking_id):
         return {
             'status': 'error',
             'message': f"Error creating contact from booking: {str(e)}"
-        }
\ No newline at end of file
+        }
+
+
+@shared_task
+def rebuild_contact_search_vectors(organizer_id=None):
+    """Rebuild full-text search documents (backfill after bulk writes or schema changes)."""
+    from .search import update_search_vectors
+    
+    contacts = Contact.objects.all()
+    if organizer_id:
+        contacts = contacts.filter(organizer_id=organizer_id)
+    
+    updated_count = update_search_vectors(contacts)
+    
+    return {
+        'status': 'success',
+        'message': f"Rebuilt search vectors for {updated_count} contacts",
+        'updated_count': updated_count
+    }
+
+
+@shared_task
+def backfill_contact_search_vectors():
+    """Fill in search documents for contacts that don't have one yet (periodic repair)."""
+    from .search import assign_missing_search_vectors
+    
+    updated_count = assign_missing_search_vectors(Contact.objects.all())
+    
+    return {
+        'status': 'success',
+        'message': f"Backfilled search vectors for {updated_count} contacts",
+        'updated_count': updated_count
+    }
+
+
+@shared_task
+def reconcile_group_member_counts():
+    """Repair drift between ContactGroup.member_count and the membership table (periodic task)."""
+    from django.db.models import Count, IntegerField, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+    from .models import ContactGroup
+    
+    actual_counts = ContactGroup.contacts.through.objects.filter(
+        contactgroup_id=OuterRef('pk')
+    ).order_by().values('contactgroup_id').annotate(count=Count('*')).values('count')
+    actual = Coalesce(Subquery(actual_counts, output_field=IntegerField()), 0)
+    
+    drifted = dict(
+        ContactGroup.objects.annotate(actual_count=actual)
+        .exclude(member_count=F('actual_count'))
+        .values_list('pk', 'organizer_id')
+    )
+    repaired_count = ContactGroup.objects.filter(pk__in=drifted).update(member_count=actual) if drifted else 0
+    
+    if repaired_count:
+        logger.warning(f"Repaired member_count drift on {repaired_count} contact groups")
+        # .update() skips signals, so retire the responses serving the drifted counts
+        from .caching import bump_organizer_version
+        for organizer_id in set(drifted.values()):
+            bump_organizer_version(organizer_id)
+    
+    return {
+        'status': 'success',
+        'message': f"Reconciled member counts, repaired {repaired_count} groups",
+        'repaired_count': repaired_count
+    }
+
+
+@shared_task
+def materialize_smart_group(group_id):
+    """Materialize a smart group's membership from its rules."""
+    from .models import ContactGroup
+    from .rules import materialize_smart_group as materialize
+    
+    try:
+        group = ContactGroup.objects.get(id=group_id, rules__isnull=False)
+        added, removed = materialize(group)
+        
+        return {
+            'status': 'success',
+            'message': f"Materialized {group.name}: {added} added, {removed} removed",
+            'added_count': added,
+            'removed_count': removed
+        }
+    
+    except ContactGroup.DoesNotExist:
+        return {
+            'status': 'error',
+            'message': f"Smart group {group_id} not found"
+        }
+    except Exception as e:
+        logger.error(f"Error materializing smart group: {str(e)}")
+        return {
+            'status': 'error',
+            'message': f"Error materializing smart group: {str(e)}"
+        }
+
+
+@shared_task
+def refresh_smart_groups():
+    """Re-materialize all smart groups so relative date rules stay current (periodic task)."""
+    from .models import ContactGroup
+    from .rules import materialize_smart_group as materialize
+    
+    refreshed_count = 0
+    for group in ContactGroup.objects.filter(rules__isnull=False).iterator():
+        try:
+            materialize(group)
+            refreshed_count += 1
+        except Exception as e:
+            logger.error(f"Error refreshing smart group {group.id}: {str(e)}")
+    
+    return {
+        'status': 'success',
+        'message': f"Refreshed {refreshed_count} smart groups",
+        'refreshed_count': refreshed_count
+    }
+
+
+@shared_task
+def rebuild_group_bitmaps(organizer_id=None):
+    """Backfill contact index ids and rebuild group membership bitmaps (periodic repair)."""
+    from .bitmaps import assign_missing_index_ids, rebuild_group_bitmap
+    from .models import ContactGroup
+    
+    groups = ContactGroup.objects.all()
+    if organizer_id:
+        groups = groups.filter(organizer_id=organizer_id)
+    
+    organizer_ids = set(groups.values_list('organizer_id', flat=True).distinct())
+    assigned_count = sum(assign_missing_index_ids(org_id) for org_id in organizer_ids)
+    
+    rebuilt_count = 0
+    for group_id in groups.values_list('id', flat=True).iterator():
+        rebuild_group_bitmap(group_id)
+        rebuilt_count += 1
+    
+    return {
+        'status': 'success',
+        'message': f"Rebuilt {rebuilt_count} group bitmaps, assigned {assigned_count} index ids",
+        'rebuilt_count': rebuilt_count,
+        'assigned_count': assigned_count
+    }
+
+
+@shared_task
+def maintain_interaction_partitions():
+    """Create upcoming monthly interaction partitions and drop expired ones."""
+    from .partitions import is_partitioned, ensure_partitions, drop_expired_partitions
+    
+    if not is_partitioned():
+        return {'status': 'skipped', 'message': 'contact_interactions is not partitioned'}
+    
+    created = ensure_partitions()
+    dropped = drop_expired_partitions()
+    
+    return {
+        'status': 'success',
+        'message': f"Created {len(created)} partitions, dropped {len(dropped)}",
+        'created': created,
+        'dropped': dropped
+    }
+
+
+@shared_task
+def flush_interaction_buffer():
+    """Bulk insert buffered interactions (periodic, and queued when the buffer fills up)."""
+    from .buffer import buffering_enabled, flush_buffer
+    
+    if not buffering_enabled():
+        return {'status': 'skipped', 'message': 'Interaction write buffer is disabled'}
+    
+    processed_count = flush_buffer()
+    
+    return {
+        'status': 'success',
+        'message': f"Flushed {processed_count} buffered interactions",
+        'processed_count': processed_count
+    }
+
+
+@shared_task
+def rebuild_interaction_rollups(start_date=None, end_date=None, organizer_id=None):
+    """Backfill daily interaction rollups from raw interactions (ISO dates, default: full history)."""
+    from datetime import date
+    from django.db.models import Min
+    from .rollups import rebuild_rollups
+    
+    if start_date:
+        start_day = date.fromisoformat(start_date)
+    else:
+        interactions = ContactInteraction.objects.all()
+        if organizer_id:
+            interactions = interactions.filter(organizer_id=organizer_id)
+        oldest = interactions.aggregate(oldest=Min('created_at'))['oldest']
+        if oldest is None:
+            return {'status': 'success', 'message': 'No interactions to roll up'}
+        start_day = oldest.date()
+    end_day = date.fromisoformat(end_date) if end_date else timezone.now().date()
+    
+    rebuild_rollups(start_day, end_day, organizer_id=organizer_id)
+    
+    return {
+        'status': 'success',
+        'message': f"Rebuilt interaction rollups from {start_day} to {end_day}"
+    }
+
+
+@shared_task
+def archive_old_interactions():
+    """Move interactions older than CONTACTS_INTERACTION_ARCHIVE_AFTER_DAYS into archive segments."""
+    from django.conf import settings
+    from .archive import archive_month, get_archivable_months, get_archive_cutoff
+    
+    if not settings.CONTACTS_INTERACTION_ARCHIVE_AFTER_DAYS:
+        return {'status': 'skipped', 'message': 'Interaction archival is disabled'}
+    
+    archived_count = 0
+    segment_count = 0
+    for organizer_id, month in list(get_archivable_months(get_archive_cutoff())):
+        try:
+            archived_count += archive_month(organizer_id, month)
+            segment_count += 1
+        except Exception as e:
+            logger.error(f"Error archiving interactions for organizer {organizer_id}, {month:%Y-%m}: {str(e)}")
+    
+    return {
+        'status': 'success',
+        'message': f"Archived {archived_count} interactions into {segment_count} segments",
+        'archived_count': archived_count,
+        'segment_count': segment_count
+    }
+
+
+@shared_task
+def process_dirty_contact_stats():
+    """Recompute contact stats snapshots that have been dirty for the debounce window."""
+    from .stats import get_due_dirty_snapshots, refresh_stats_snapshot
+    
+    refreshed_count = 0
+    for organizer_id in list(get_due_dirty_snapshots()):
+        try:
+            refresh_stats_snapshot(organizer_id)
+            refreshed_count += 1
+        except Exception as e:
+            logger.error(f"Error refreshing contact stats for organizer {organizer_id}: {str(e)}")
+    
+    return {
+        'status': 'success',
+        'message': f"Refreshed {refreshed_count} contact stats snapshots",
+        'refreshed_count': refreshed_count
+    }
+
+
+@shared_task
+def cleanup_contact_exports():
+    """Delete spooled contact exports past CONTACTS_EXPORT_RETENTION_SECONDS (periodic task)."""
+    from .utils import delete_expired_exports
+    
+    deleted_count = delete_expired_exports()
+    return {
+        'status': 'success',
+        'message': f"Deleted {deleted_count} expired contact exports",
+        'deleted_count': deleted_count
+    }
+
+
+@shared_task
+def refresh_single_flight(name, args, token=None):
+    """Recompute a stale single-flight value in the background (see singleflight.py)."""
+    from . import utils  # noqa: F401 - registers the single-flight computations
+    from .singleflight import SingleFlight
+    
+    SingleFlight.registry[name].refresh(args, token)
+    return {'status': 'success', 'message': f"Refreshed {name}"}
@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from .models import Contact, ContactGroup
+from .stats import compute_contact_stats, refresh_stats_snapshot
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ContactQueryBudgetTests(APITestCase):
+    """Per-endpoint query budgets; each must stay flat as the page grows."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = get_user_model().objects.create_superuser(
+            email='organizer@example.com', password='test-password-123'
+        )
+        cls.contacts = [
+            Contact.objects.create(
+                organizer=cls.organizer,
+                first_name=f"Contact{index:02d}",
+                email=f"contact{index}@example.com",
+                company='Acme' if index % 2 else ''
+            )
+            for index in range(15)
+        ]
+        cls.groups = [
+            ContactGroup.objects.create(organizer=cls.organizer, name=f"Group {index}")
+            for index in range(3)
+        ]
+        for group in cls.groups:
+            group.contacts.add(*cls.contacts)
+    
+    def setUp(self):
+        # The locmem cache outlives each test's transaction, so cached responses
+        # and organizer versions would otherwise leak between tests.
+        cache.clear()
+        self.client.force_authenticate(self.organizer)
+    
+    def test_contact_list(self):
+        # Count estimate (EXPLAIN, PostgreSQL only), exact count, page
+        with self.assertNumQueries(3 if connection.vendor == 'postgresql' else 2):
+            response = self.client.get(reverse('contacts:contact-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 15)
+        self.assertEqual(response.data['results'][0]['groups_count'], 3)
+    
+    def test_contact_list_cursor(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('contacts:contact-list'), {'pagination': 'cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['groups_count'], 3)
+    
+    def test_contact_detail(self):
+        contact = self.contacts[0]
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('contacts:contact-detail', args=[contact.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['groups_count'], 3)
+    
+    def test_group_list(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('contacts:group-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['contact_count'], 15)
+    
+    def test_group_detail(self):
+        group = self.groups[0]
+        # Group, then its members with groups_count
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('contacts:group-detail', args=[group.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['contacts']), 15)
+    
+    def test_group_members(self):
+        group = self.groups[0]
+        # Group lookup, then the members page
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('contacts:group-contacts', args=[group.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 15)
+    
+    def test_group_update_keeps_groups_count(self):
+        group = self.groups[0]
+        response = self.client.patch(
+            reverse('contacts:group-detail', args=[group.pk]), {'description': 'Updated'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(contact['groups_count'] == 3 for contact in response.data['contacts']))
+    
+    def test_compute_contact_stats(self):
+        # One aggregate over contacts, top companies, group count, rollup sum
+        with self.assertNumQueries(4):
+            stats = compute_contact_stats(self.organizer.id)
+        self.assertEqual(stats['total_contacts'], 15)
+        self.assertEqual(stats['active_contacts'], 15)
+        self.assertEqual(stats['total_groups'], 3)
+        self.assertEqual(stats['top_companies'], [{'company': 'Acme', 'count': 7}])
+    
+    def test_contact_stats(self):
+        refresh_stats_snapshot(self.organizer.id)
+        # A primary-key read of the snapshot
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('contacts:contact-stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_contacts'], 15)
@@ -0,0 +1,164 @@
+"""
+Time-series trends for contacts.
+
+Counts are bucketed in SQL with ``date_trunc`` (``Trunc*`` functions) in UTC.
+Closed buckets never change under normal writes, so each is cached for
+``CONTACTS_TRENDS_BUCKET_CACHE_TIMEOUT`` (long, but finite so that keys
+orphaned by a generation bump expire); only missing closed buckets and the
+open (current) bucket are queried. Deletes can still lower past counts, so they bump a per-organizer
+trends generation that is part of every bucket's cache key.
+
+Metrics::
+
+    contacts_created   contacts created in the period
+    contacts_booked    distinct contacts with a booking created in the period
+
+``contacts_booked`` reads ``Booking`` rather than ``booking_created``
+interactions: archival and retention remove old interaction rows, so a bucket
+recomputed from them after a generation bump or cache eviction would drop to 0.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from .models import Contact
+from .partitions import add_months
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+MAX_BUCKETS = 400
+
+
+def _contacts_created(organizer_id):
+    return Contact.objects.filter(organizer_id=organizer_id), Count('id')
+
+
+def _contacts_booked(organizer_id):
+    from apps.events.models import Booking
+    # Contacts are unique per (organizer, email), matching how bookings create them
+    bookings = Booking.objects.filter(
+        organizer_id=organizer_id,
+        invitee_email__in=Contact.objects.filter(organizer_id=organizer_id).values('email')
+    )
+    return bookings, Count('invitee_email', distinct=True)
+
+
+METRICS = {
+    'contacts_created': _contacts_created,
+    'contacts_booked': _contacts_booked,
+}
+
+
+def get_generation_cache_key(organizer_id):
+    return f"contacts:trends:generation:{organizer_id}"
+
+
+def get_trends_generation(organizer_id):
+    key = get_generation_cache_key(organizer_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, int(timezone.now().timestamp()), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_trends_generation(organizer_id):
+    key = get_generation_cache_key(organizer_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(timezone.now().timestamp()), None)
+
+
+def has_closed_bookings(organizer_id, emails):
+    """Whether any of ``emails`` booked before today (UTC), i.e. within a closed bucket."""
+    from apps.events.models import Booking
+    return Booking.objects.filter(
+        organizer_id=organizer_id,
+        invitee_email__in=emails,
+        created_at__lt=bucket_start(timezone.now(), 'day')
+    ).exists()
+
+
+def bucket_start(value, granularity):
+    """Start of the UTC bucket containing ``value`` (a date or datetime)."""
+    day = value.astimezone(dt_timezone.utc).date() if isinstance(value, datetime) else value
+    if granularity == 'week':
+        day -= timedelta(days=day.weekday())
+    elif granularity == 'month':
+        day = day.replace(day=1)
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def next_bucket(start, granularity):
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    if granularity == 'week':
+        return start + timedelta(weeks=1)
+    return add_months(start, 1)
+
+
+def get_bucket_starts(start_date, end_date, granularity):
+    """Bucket starts covering ``[start_date, end_date]``."""
+    buckets = []
+    current = bucket_start(start_date, granularity)
+    last = bucket_start(end_date, granularity)
+    while current <= last:
+        buckets.append(current)
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def compute_buckets(organizer_id, metric, granularity, start, end):
+    """Counts per bucket start for ``[start, end)``, in a single grouped query."""
+    queryset, aggregate = METRICS[metric](organizer_id)
+    rows = (
+        queryset
+        .filter(created_at__gte=start, created_at__lt=end)
+        .annotate(bucket=GRANULARITIES[granularity]('created_at', tzinfo=dt_timezone.utc))
+        .values('bucket')
+        .annotate(count=aggregate)
+        .order_by()
+    )
+    return {row['bucket']: row['count'] for row in rows}
+
+
+def get_bucket_cache_key(organizer_id, generation, metric, granularity, start):
+    return f"contacts:trends:{organizer_id}:{generation}:{metric}:{granularity}:{start:%Y-%m-%d}"
+
+
+def get_trend(organizer_id, metric, granularity, start_date, end_date):
+    """Return ``[{'period': date, 'count': n}, ...]`` for the requested range."""
+    buckets = get_bucket_starts(start_date, end_date, granularity)
+    open_start = bucket_start(timezone.now(), granularity)
+    generation = get_trends_generation(organizer_id)
+    
+    closed = [bucket for bucket in buckets if bucket < open_start]
+    keys = {bucket: get_bucket_cache_key(organizer_id, generation, metric, granularity, bucket) for bucket in closed}
+    cached = cache.get_many(keys.values())
+    counts = {bucket: cached[key] for bucket, key in keys.items() if key in cached}
+    
+    missing = [bucket for bucket in closed if bucket not in counts]
+    if missing:
+        computed = compute_buckets(
+            organizer_id, metric, granularity, missing[0], next_bucket(missing[-1], granularity)
+        )
+        fresh = {bucket: computed.get(bucket, 0) for bucket in missing}
+        counts.update(fresh)
+        cache.set_many(
+            {keys[bucket]: count for bucket, count in fresh.items()}, settings.CONTACTS_TRENDS_BUCKET_CACHE_TIMEOUT
+        )
+    
+    if buckets[-1] >= open_start:
+        # The open bucket (and any future ones) always come from the database
+        counts.update(compute_buckets(
+            organizer_id, metric, granularity, open_start, next_bucket(buckets[-1], granularity)
+        ))
+    
+    return [{'period': bucket.date(), 'count': counts.get(bucket, 0)} for bucket in buckets]
@@ -6,18 +6,24 @@ app_name = 'contacts'
 urlpatterns = [
     # Contacts
     path('', views.ContactListCreateView.as_view(), name='contact-list'),
+    path('suggest/', views.contact_suggestions, name='contact-suggest'),
     path('<uuid:pk>/', views.ContactDetailView.as_view(), name='contact-detail'),
     path('<uuid:contact_id>/interactions/', views.ContactInteractionListView.as_view(), name='contact-interactions'),
     path('<uuid:contact_id>/interactions/add/', views.add_contact_interaction, name='add-interaction'),
     
     # Contact Groups
     path('groups/', views.ContactGroupListCreateView.as_view(), name='group-list'),
+    path('groups/sets/', views.group_set_query, name='group-set-query'),
     path('groups/<uuid:pk>/', views.ContactGroupDetailView.as_view(), name='group-detail'),
+    path('groups/<uuid:pk>/contacts/', views.ContactGroupContactsView.as_view(), name='group-contacts'),
+    path('groups/<uuid:group_id>/contacts/bulk/', views.bulk_update_group_membership, name='group-contacts-bulk'),
     path('<uuid:contact_id>/groups/<uuid:group_id>/add/', views.add_contact_to_group, name='add-to-group'),
     path('<uuid:contact_id>/groups/<uuid:group_id>/remove/', views.remove_contact_from_group, name='remove-from-group'),
     
     # Statistics and Analytics
     path('stats/', views.contact_stats, name='contact-stats'),
+    path('trends/', views.contact_trends, name='contact-trends'),
+    path('tags/', views.contact_tag_facets, name='contact-tags'),
     
     # Import/Export
     path('import/', views.import_contacts, name='import-contacts'),
@@ -28,6 +34,10 @@ urlpatterns = [
     
     # All Interactions
     path('interactions/', views.ContactInteractionListView.as_view(), name='all-interactions'),
+    path('interactions/activity/', views.interaction_activity, name='interaction-activity'),
+    
+    # Cache Metrics
+    path('cache/metrics/', views.response_cache_metrics, name='response-cache-metrics'),
     
     # Task Status
     path('tasks/<uuid:task_id>/status/', views.TaskStatusView.as_view(), name='task-status'),
@@ -0,0 +1,182 @@
+import csv
+import io
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import connection
+from django.utils import timezone
+from .models import Contact, ContactGroup
+from .singleflight import SingleFlight
+from .storage import private_storage
+
+
+TAG_FACETS_SQL = """
+    SELECT tag, COUNT(*) AS count
+    FROM contacts, jsonb_array_elements_text(contacts.tags) AS tag
+    WHERE contacts.organizer_id = %s AND jsonb_typeof(contacts.tags) = 'array'
+    GROUP BY tag
+    ORDER BY count DESC, tag
+"""
+
+
+def compute_tag_facets(organizer_id):
+    """Count contacts per tag for an organizer in a single aggregate query."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(TAG_FACETS_SQL, [organizer_id])
+            return [{'tag': tag, 'count': count} for tag, count in cursor.fetchall()]
+    
+    counts = Counter()
+    for tags in Contact.objects.filter(organizer_id=organizer_id).values_list('tags', flat=True):
+        counts.update(tags or [])
+    return [
+        {'tag': tag, 'count': count}
+        for tag, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+ADD_GROUP_MEMBERS_SQL = """
+    INSERT INTO {table} (contactgroup_id, contact_id)
+    SELECT %s, matched.contact_id FROM ({contacts}) AS matched(contact_id)
+    ON CONFLICT (contactgroup_id, contact_id) DO NOTHING
+"""
+
+
+def add_group_members(group_id, contacts):
+    """
+    Add the contacts in a queryset to a group; returns the memberships created.
+    
+    On PostgreSQL this is one ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``,
+    so ids never pass through Python and the count is exactly the rows this
+    statement inserted, even when other requests add members concurrently.
+    Elsewhere only ids without a membership are selected and inserted, at
+    most ``CONTACTS_BULK_MEMBERSHIP_MAX_IDS`` of them; more raises ValueError.
+    """
+    Membership = ContactGroup.contacts.through
+    contact_ids = contacts.order_by().values_list('id', flat=True).distinct()
+    
+    if connection.vendor == 'postgresql':
+        sql, params = contact_ids.query.sql_with_params()
+        table = connection.ops.quote_name(Membership._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(ADD_GROUP_MEMBERS_SQL.format(table=table, contacts=sql), [group_id, *params])
+            return cursor.rowcount
+    
+    max_ids = settings.CONTACTS_BULK_MEMBERSHIP_MAX_IDS
+    existing = Membership.objects.filter(contactgroup_id=group_id).values('contact_id')
+    new_ids = list(contact_ids.exclude(id__in=existing)[:max_ids + 1])
+    if len(new_ids) > max_ids:
+        raise ValueError(f"More than {max_ids} contacts would be added; narrow the filter.")
+    
+    Membership.objects.bulk_create(
+        [Membership(contactgroup_id=group_id, contact_id=contact_id) for contact_id in new_ids],
+        batch_size=settings.CONTACTS_BULK_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    return len(new_ids)
+
+
+def get_tag_facets(organizer_id):
+    """Get cached per-tag contact counts for an organizer."""
+    return TAG_FACETS.get(organizer_id)
+
+
+def invalidate_tag_facets(organizer_id):
+    # Keep serving the old counts while one background refresh recomputes them
+    TAG_FACETS.expire(organizer_id)
+
+
+EXPORT_COLUMNS = [
+    'First Name', 'Last Name', 'Email', 'Phone', 'Company',
+    'Job Title', 'Notes', 'Tags', 'Total Bookings', 'Last Booking Date'
+]
+
+
+def get_export_directory(organizer_id):
+    return f"{settings.CONTACTS_EXPORT_PATH}/{organizer_id}"
+
+
+def build_contacts_export(organizer_id, version=None):
+    """
+    Spool an organizer's contacts as CSV to private storage; returns its path.
+    
+    Rows go through a temporary file, so neither the worker nor the cache
+    holds the whole export. The file is named by ``version``, so any contact
+    write produces a new one; old ones are removed by ``delete_expired_exports``.
+    """
+    path = f"{get_export_directory(organizer_id)}/{version}.csv"
+    if private_storage.exists(path):
+        return path
+    
+    with tempfile.TemporaryFile() as spool:
+        text = io.TextIOWrapper(spool, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_COLUMNS)
+        
+        for contact in Contact.objects.filter(organizer_id=organizer_id).iterator():
+            writer.writerow([
+                contact.first_name,
+                contact.last_name,
+                contact.email,
+                contact.phone,
+                contact.company,
+                contact.job_title,
+                contact.notes,
+                ','.join(contact.tags) if contact.tags else '',
+                contact.total_bookings,
+                contact.last_booking_date.strftime('%Y-%m-%d') if contact.last_booking_date else ''
+            ])
+        
+        text.flush()
+        text.detach()
+        spool.seek(0)
+        path = private_storage.save(path, File(spool))
+    
+    delete_expired_exports(organizer_id)
+    return path
+
+
+def delete_expired_exports(organizer_id=None):
+    """
+    Delete exports older than ``CONTACTS_EXPORT_RETENTION_SECONDS``; returns the number deleted.
+    
+    Exports are deleted by age rather than when superseded, so a response still
+    streaming an older one (whose path stays cached for up to
+    ``CONTACTS_EXPORT_CACHE_TIMEOUT``) isn't cut off.
+    """
+    if organizer_id is not None:
+        directories = [get_export_directory(organizer_id)]
+    elif private_storage.exists(settings.CONTACTS_EXPORT_PATH):
+        subdirectories, _ = private_storage.listdir(settings.CONTACTS_EXPORT_PATH)
+        directories = [f"{settings.CONTACTS_EXPORT_PATH}/{name}" for name in subdirectories]
+    else:
+        directories = []
+    
+    cutoff = timezone.now() - timedelta(seconds=settings.CONTACTS_EXPORT_RETENTION_SECONDS)
+    deleted = 0
+    for directory in directories:
+        if not private_storage.exists(directory):
+            continue
+        _, names = private_storage.listdir(directory)
+        for name in names:
+            path = f"{directory}/{name}"
+            if private_storage.get_modified_time(path) < cutoff:
+                private_storage.delete(path)
+                deleted += 1
+    return deleted
+
+
+TAG_FACETS = SingleFlight(
+    'tag_facets',
+    compute_tag_facets,
+    fresh_timeout=settings.CONTACTS_TAG_FACETS_CACHE_TIMEOUT,
+    stale_timeout=settings.CONTACTS_TAG_FACETS_STALE_TIMEOUT
+)
+
+CONTACTS_EXPORT = SingleFlight(
+    'contacts_export',
+    build_contacts_export,
+    fresh_timeout=settings.CONTACTS_EXPORT_CACHE_TIMEOUT
+)
@@ -1,17 +1,43 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.utils import timezone
 from datetime import timedelta
+import uuid
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count
+from django.db import transaction
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import F, Prefetch
 from celery.result import AsyncResult
-from .models import Contact, ContactGroup, ContactInteraction
+from .models import Contact, ContactGroup, ContactInteraction, InteractionDailyRollup
 from .serializers import (
     ContactSerializer, ContactCreateSerializer, ContactGroupSerializer,
-    ContactGroupCreateSerializer, ContactInteractionSerializer,
-    ContactStatsSerializer, ContactImportSerializer
+    ContactGroupListSerializer, ContactGroupCreateSerializer, ContactInteractionSerializer,
+    ContactInteractionCreateSerializer, ContactStatsSerializer, ContactImportSerializer,
+    BulkGroupMembershipSerializer, GroupSetQuerySerializer, TrendQuerySerializer
+)
+from .search import suggest_contacts
+from .filters import filter_contacts, filter_interactions, parse_interaction_filters
+from .archive import iter_archived_rows
+from .buffer import record_interaction, buffering_enabled
+from .stats import get_contact_stats, get_stats_computed_at
+from .trends import get_trend
+from .bitmaps import rebuild_group_bitmap, load_group_bitmaps, evaluate_group_expression
+from .utils import add_group_members, get_tag_facets, CONTACTS_EXPORT
+from .fieldsets import SparseFieldsetViewMixin
+from .storage import private_storage
+from .fastpath import fast_path_available, get_contact_fields, get_contact_columns, build_contact_rows
+from .renderers import ORJSONRenderer
+from .caching import (
+    ConditionalGetMixin, ResponseCacheMixin, conditional_get, get_response_cache_metrics,
+    bump_organizer_version, get_organizer_version
+)
+from .pagination import (
+    KeysetPaginationMixin, ContactPageNumberPagination, ContactKeysetPagination,
+    ContactInteractionKeysetPagination
 )
 from .permissions import (
     CanViewContacts, CanManageContacts, CanViewContactGroups, 
@@ -19,96 +45,201 @@ from .permissions import (
 )
 
 
-class ContactListCreateView(generics.ListCreateAPIView):
+class ContactListCreateView(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsetViewMixin, KeysetPaginationMixin, generics.ListCreateAPIView):
     permission_classes = [CanViewContacts, CanManageContacts]
+    pagination_class = ContactPageNumberPagination
+    keyset_pagination_class = ContactKeysetPagination
+    sparse_field_dependencies = {'full_name': ('first_name', 'last_name'), 'groups_count': ()}
+    sparse_always_load = ('id', 'first_name', 'last_name')
     
     def get_queryset(self):
-        queryset = Contact.objects.filter(organizer=self.request.user)
-        
-        # Filter by search query
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(company__icontains=search)
-            )
+        queryset = self.apply_sparse_fieldset(Contact.objects.filter(organizer=self.request.user))
+        if self.sparse_field_selected('groups_count'):
+            queryset = queryset.with_groups_count()
         
-        # Filter by group
-        group_id = self.request.query_params.get('group')
-        if group_id:
-            queryset = queryset.filter(groups__id=group_id)
-        
-        # Filter by tags
-        # Note: This uses PostgreSQL-specific JSONField __contains lookup
-        tags = self.request.query_params.get('tags')
-        if tags:
-            tag_list = [tag.strip() for tag in tags.split(',')]
-            for tag in tag_list:
-                queryset = queryset.filter(tags__contains=[tag])
-        
-        # Filter by active status
-        is_active = self.request.query_params.get('is_active')
-        if is_active is not None:
-            queryset = queryset.filter(is_active=is_active.lower() == 'true')
-        
-        return queryset.order_by('first_name', 'last_name')
+        return filter_contacts(queryset, self.request.query_params)
+    
+    def wants_keyset_pagination(self):
+        wants_keyset = super().wants_keyset_pagination()
+        # Cursors follow the name ordering, which would discard the search ranking
+        if wants_keyset and self.request.query_params.get('search'):
+            raise ValidationError({'search': 'Search results use page-number pagination, not cursors.'})
+        return wants_keyset
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return ContactCreateSerializer
         return ContactSerializer
     
+    def use_fast_path(self):
+        """Opt-in (``?fast=true``) values()-based serialization rendered with orjson."""
+        return (
+            self.request.method == 'GET' and
+            self.request.query_params.get('fast', '').lower() == 'true' and
+            fast_path_available()
+        )
+    
+    def get_renderers(self):
+        if self.use_fast_path():
+            return [ORJSONRenderer()]
+        return super().get_renderers()
+    
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_path():
+            return super().list(request, *args, **kwargs)
+        
+        fields = get_contact_fields(self.get_sparse_fieldset())
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*get_contact_columns(fields))
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(build_contact_rows(page, fields))
+        return Response(build_contact_rows(rows, fields))
+    
     def perform_create(self, serializer):
         serializer.save(organizer=self.request.user)
 
 
-class ContactDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ContactDetailView(ConditionalGetMixin, SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [CanViewContacts, CanManageContacts]
     serializer_class = ContactSerializer
+    sparse_field_dependencies = ContactListCreateView.sparse_field_dependencies
     
     def get_queryset(self):
-        return Contact.objects.filter(organizer=self.request.user)
+        queryset = self.apply_sparse_fieldset(Contact.objects.filter(organizer=self.request.user))
+        if self.sparse_field_selected('groups_count'):
+            queryset = queryset.with_groups_count()
+        return queryset
 
 
-class ContactGroupListCreateView(generics.ListCreateAPIView):
+class ContactGroupListCreateView(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsetViewMixin, generics.ListCreateAPIView):
     permission_classes = [CanViewContactGroups, CanManageContactGroups]
+    sparse_field_dependencies = {'contact_count': ('member_count',), 'is_smart': ('rules',)}
     
     def get_queryset(self):
-        return ContactGroup.objects.filter(organizer=self.request.user).prefetch_related('contacts')
+        return self.apply_sparse_fieldset(ContactGroup.objects.filter(organizer=self.request.user))
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return ContactGroupCreateSerializer
-        return ContactGroupSerializer
+        return ContactGroupListSerializer
     
     def perform_create(self, serializer):
-        serializer.save(organizer=self.request.user)
+        group = serializer.save(organizer=self.request.user)
+        if group.is_smart:
+            from .tasks import materialize_smart_group
+            materialize_smart_group.delay(group.id)
 
 
-class ContactGroupDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ContactGroupDetailView(ConditionalGetMixin, SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [CanViewContactGroups, CanManageContactGroups]
     serializer_class = ContactGroupSerializer
+    sparse_field_dependencies = ContactGroupListCreateView.sparse_field_dependencies
     
     def get_queryset(self):
-        return ContactGroup.objects.filter(organizer=self.request.user).prefetch_related('contacts')
+        queryset = self.apply_sparse_fieldset(ContactGroup.objects.filter(organizer=self.request.user))
+        if self.sparse_field_selected('contacts'):
+            queryset = queryset.prefetch_related(
+                Prefetch('contacts', queryset=Contact.objects.with_groups_count())
+            )
+        return queryset
+    
+    def perform_update(self, serializer):
+        group = serializer.save()
+        if 'rules' in serializer.validated_data and group.is_smart:
+            from .tasks import materialize_smart_group
+            materialize_smart_group.delay(group.id)
+        # UpdateModelMixin discards the prefetch after saving, which would
+        # reload members without groups_count; render from a fresh fetch instead
+        serializer.instance = self.get_queryset().get(pk=group.pk)
+
+
+class ContactGroupContactsView(ConditionalGetMixin, SparseFieldsetViewMixin, generics.ListAPIView):
+    """Members of a group, keyset-paginated over (first_name, last_name, id)."""
+    permission_classes = [CanViewContactGroups, CanViewContacts]
+    serializer_class = ContactSerializer
+    pagination_class = ContactKeysetPagination
+    sparse_field_dependencies = ContactListCreateView.sparse_field_dependencies
+    sparse_always_load = ContactListCreateView.sparse_always_load
+    
+    def get_queryset(self):
+        group = get_object_or_404(ContactGroup, id=self.kwargs['pk'], organizer=self.request.user)
+        
+        queryset = self.apply_sparse_fieldset(
+            Contact.objects.filter(organizer=self.request.user, groups=group)
+        )
+        if self.sparse_field_selected('groups_count'):
+            queryset = queryset.with_groups_count()
+        return queryset
 
 
-class ContactInteractionListView(generics.ListAPIView):
+class ContactInteractionListView(SparseFieldsetViewMixin, KeysetPaginationMixin, generics.ListAPIView):
     permission_classes = [CanViewContactInteractions]
     serializer_class = ContactInteractionSerializer
+    pagination_class = ContactPageNumberPagination
+    keyset_pagination_class = ContactInteractionKeysetPagination
+    sparse_field_dependencies = {
+        'contact_name': ('contact',),
+        'contact_id': ('contact',),
+        'booking_id': ('booking',),
+        'interaction_type_display': ('interaction_type',),
+    }
+    sparse_always_load = ('id', 'created_at')
     
     def get_queryset(self):
+        queryset = ContactInteraction.objects.filter(organizer=self.request.user)
+        
         contact_id = self.kwargs.get('contact_id')
         if contact_id:
-            return ContactInteraction.objects.filter(
-                contact_id=contact_id,
-                organizer=self.request.user
-            ).select_related('contact', 'booking')
-        return ContactInteraction.objects.filter(
-            organizer=self.request.user
-        ).select_related('contact', 'booking')
+            queryset = queryset.filter(contact_id=contact_id)
+        
+        queryset = filter_interactions(queryset, self.request.query_params)
+        queryset = self.apply_sparse_fieldset(queryset)
+        if self.sparse_field_selected('contact_name') or self.sparse_field_selected('contact_id'):
+            queryset = queryset.select_related('contact')
+        if self.sparse_field_selected('booking_id'):
+            queryset = queryset.select_related('booking')
+        return queryset
+    
+    def include_archived(self):
+        return self.request.query_params.get('include_archived', '').lower() == 'true'
+    
+    def wants_keyset_pagination(self):
+        # Archived history is only reachable through cursor pagination
+        return self.include_archived() or super().wants_keyset_pagination()
+    
+    def get_archived_rows(self, descending=True, boundary=None):
+        """Archived interactions matching this request's filters, or None when not requested."""
+        if not self.include_archived():
+            return None
+        interaction_types, since, until = parse_interaction_filters(self.request.query_params)
+        return iter_archived_rows(
+            self.request.user.id,
+            descending=descending,
+            boundary=boundary,
+            contact_id=self.kwargs.get('contact_id'),
+            interaction_types=interaction_types,
+            since=since,
+            until=until
+        )
+    
+    def list(self, request, *args, **kwargs):
+        if not self.include_archived():
+            return super().list(request, *args, **kwargs)
+        
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        
+        # Archived rows are stored already serialized; serialize only the live ones
+        live_data = iter(self.get_serializer([row for row in page if not isinstance(row, dict)], many=True).data)
+        selected = self.get_sparse_fieldset()
+        data = []
+        for row in page:
+            if isinstance(row, dict):
+                data.append({name: value for name, value in row.items() if selected is None or name in selected})
+            else:
+                data.append(next(live_data))
+        return self.get_paginated_response(data)
 
 
 class TaskStatusView(APIView):
@@ -132,52 +263,119 @@ class TaskStatusView(APIView):
             )
 
 
+def stats_time_bucket(request):
+    # Stats use rolling windows, so validators also roll over daily
+    return (timezone.now().date(),)
+
+
+def stats_computed_at(request):
+    # Snapshot recomputes change the payload without an organizer version bump
+    return get_stats_computed_at(request.user.id)
+
+
+def stats_validators(request):
+    return (*stats_time_bucket(request), stats_computed_at(request))
+
+
 @api_view(['GET'])
 @permission_classes([CanViewContacts])
+@conditional_get(stats_validators, stats_computed_at)
 def contact_stats(request):
     """Get contact statistics."""
-    contacts = Contact.objects.filter(organizer=request.user)
-    groups = ContactGroup.objects.filter(organizer=request.user)
-    interactions = ContactInteraction.objects.filter(organizer=request.user)
-    
-    # Calculate statistics
-    stats = {
-        'total_contacts': contacts.count(),
-        'active_contacts': contacts.filter(is_active=True).count(),
-        'total_groups': groups.count(),
-        'recent_interactions': interactions.filter(
-            created_at__gte=timezone.now() - timedelta(days=30)
-        ).count(),
-    }
-    
-    # Top companies
-    top_companies = list(
-        contacts.exclude(company='')
-        .values('company')
-        .annotate(count=Count('id'))
-        .order_by('-count')[:5]
-    )
-    stats['top_companies'] = top_companies
-    
-    # Booking frequency
-    booking_frequency = {
-        'this_month': contacts.filter(
-            last_booking_date__gte=timezone.now() - timedelta(days=30)
-        ).count(),
-        'last_month': contacts.filter(
-            last_booking_date__gte=timezone.now() - timedelta(days=60),
-            last_booking_date__lt=timezone.now() - timedelta(days=30)
-        ).count(),
-        'this_year': contacts.filter(
-            last_booking_date__gte=timezone.now() - timedelta(days=365)
-        ).count(),
-    }
-    stats['booking_frequency'] = booking_frequency
+    stats = get_contact_stats(request.user.id)
     
     serializer = ContactStatsSerializer(stats)
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([CanViewContactInteractions])
+@conditional_get(stats_time_bucket)
+def interaction_activity(request):
+    """Daily interaction counts per type, read from the rollup table."""
+    try:
+        days = int(request.query_params.get('days', 30))
+    except ValueError:
+        days = 30
+    days = max(1, min(days, 366))
+    
+    rollups = InteractionDailyRollup.objects.filter(
+        organizer=request.user,
+        day__gte=timezone.now().date() - timedelta(days=days - 1)
+    )
+    interaction_type = request.query_params.get('interaction_type')
+    if interaction_type:
+        rollups = rollups.filter(interaction_type=interaction_type)
+    
+    return Response({
+        'days': days,
+        'results': list(rollups.order_by('day', 'interaction_type').values('day', 'interaction_type', 'count')),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([CanViewContacts])
+@conditional_get(stats_time_bucket)
+def contact_trends(request):
+    """Contacts created or booked per day/week/month over a date range."""
+    serializer = TrendQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    params = serializer.validated_data
+    results = get_trend(request.user.id, params['metric'], params['granularity'], params['start'], params['end'])
+    
+    return Response({
+        'metric': params['metric'],
+        'granularity': params['granularity'],
+        'start': params['start'],
+        'end': params['end'],
+        'results': results,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def response_cache_metrics(request):
+    """Get hit-rate metrics for the contact list response cache."""
+    return Response(get_response_cache_metrics())
+
+
+@api_view(['GET'])
+@permission_classes([CanViewContacts])
+def contact_suggestions(request):
+    """Typeahead suggestions: a small id/name/email payload ordered by similarity."""
+    term = request.query_params.get('q', '').strip()
+    if not term:
+        return Response({'results': []})
+    
+    try:
+        limit = int(request.query_params.get('limit', settings.CONTACTS_SUGGEST_DEFAULT_LIMIT))
+    except ValueError:
+        limit = settings.CONTACTS_SUGGEST_DEFAULT_LIMIT
+    limit = max(1, min(limit, settings.CONTACTS_SUGGEST_MAX_LIMIT))
+    
+    rows = suggest_contacts(Contact.objects.filter(organizer=request.user), term, limit)
+    
+    return Response({
+        'results': [
+            {
+                'id': contact_id,
+                'full_name': f"{first_name} {last_name}".strip(),
+                'email': email,
+            }
+            for contact_id, first_name, last_name, email in rows
+        ]
+    })
+
+
+@api_view(['GET'])
+@permission_classes([CanViewContacts])
+def contact_tag_facets(request):
+    """Get per-tag contact counts for the organizer."""
+    return Response({'tags': get_tag_facets(request.user.id)})
+
+
 @api_view(['POST'])
 @permission_classes([CanManageContacts, CanManageContactGroups])
 def add_contact_to_group(request, contact_id, group_id):
@@ -185,6 +383,12 @@ def add_contact_to_group(request, contact_id, group_id):
     contact = get_object_or_404(Contact, id=contact_id, organizer=request.user)
     group = get_object_or_404(ContactGroup, id=group_id, organizer=request.user)
     
+    if group.is_smart:
+        return Response(
+            {'error': 'Membership of smart groups is managed by their rules'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     group.contacts.add(contact)
     
     return Response({'message': f'Contact added to {group.name}'})
@@ -197,31 +401,146 @@ def remove_contact_from_group(request, contact_id, group_id):
     contact = get_object_or_404(Contact, id=contact_id, organizer=request.user)
     group = get_object_or_404(ContactGroup, id=group_id, organizer=request.user)
     
+    if group.is_smart:
+        return Response(
+            {'error': 'Membership of smart groups is managed by their rules'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     group.contacts.remove(contact)
     
     return Response({'message': f'Contact removed from {group.name}'})
 
 
+@api_view(['POST'])
+@permission_classes([CanManageContacts, CanManageContactGroups])
+def bulk_update_group_membership(request, group_id):
+    """Add or remove many contacts, given by ids or a contact list filter, in one request."""
+    group = get_object_or_404(ContactGroup, id=group_id, organizer=request.user)
+    
+    if group.is_smart:
+        return Response(
+            {'error': 'Membership of smart groups is managed by their rules'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    serializer = BulkGroupMembershipSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    action = serializer.validated_data['action']
+    contacts = Contact.objects.filter(organizer=request.user)
+    if 'filter' in serializer.validated_data:
+        contacts = filter_contacts(contacts, serializer.validated_data['filter'])
+    else:
+        contacts = contacts.filter(id__in=serializer.validated_data['contact_ids'])
+    
+    Membership = ContactGroup.contacts.through
+    memberships = Membership.objects.filter(contactgroup_id=group.id)
+    
+    try:
+        with transaction.atomic():
+            if action == 'add':
+                # Ownership is validated by selecting only the organizer's contacts;
+                # the count is what was actually inserted, so concurrent adds can't skew it
+                changed = add_group_members(group.id, contacts)
+            else:
+                changed, _ = memberships.filter(contact_id__in=contacts.order_by().values('id')).delete()
+            
+            if changed:
+                delta = changed if action == 'add' else -changed
+                ContactGroup.objects.filter(id=group.id).update(member_count=F('member_count') + delta)
+                rebuild_group_bitmap(group.id)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # The through-table writes bypass m2m_changed, so invalidate explicitly
+    if changed:
+        bump_organizer_version(request.user.id)
+    
+    key = 'added' if action == 'add' else 'removed'
+    return Response({key: changed, 'group_id': group.id})
+
+
+@api_view(['POST'])
+@permission_classes([CanViewContactGroups])
+def group_set_query(request):
+    """Count contacts in (all of) & (any of) minus (none of) groups using membership bitmaps."""
+    serializer = GroupSetQuerySerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    all_of = serializer.validated_data.get('all', [])
+    any_of = serializer.validated_data.get('any', [])
+    none_of = serializer.validated_data.get('none', [])
+    requested = set(all_of) | set(any_of) | set(none_of)
+    
+    bitmaps = load_group_bitmaps(request.user.id, requested)
+    missing = requested - set(bitmaps)
+    if missing:
+        return Response(
+            {'error': f"Groups not found: {', '.join(sorted(str(group_id) for group_id in missing))}"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    result = evaluate_group_expression(bitmaps, all_of, any_of, none_of)
+    data = {
+        'count': result.count(),
+        'group_counts': {str(group_id): bitmap.count() for group_id, bitmap in bitmaps.items()},
+    }
+    
+    if serializer.validated_data['overlaps']:
+        group_ids = sorted(set(all_of) | set(any_of), key=str)
+        data['overlaps'] = [
+            {'group_a': a, 'group_b': b, 'count': (bitmaps[a] & bitmaps[b]).count()}
+            for i, a in enumerate(group_ids)
+            for b in group_ids[i + 1:]
+        ]
+    
+    limit = serializer.validated_data['contacts_limit']
+    if limit:
+        index_ids = []
+        for index_id in result:
+            index_ids.append(index_id)
+            if len(index_ids) >= limit:
+                break
+        data['contact_ids'] = list(
+            Contact.objects.filter(organizer=request.user, index_id__in=index_ids).values_list('id', flat=True)
+        )
+    
+    return Response(data)
+
+
 @api_view(['POST'])
 @permission_classes([CanAddContactInteractions])
 def add_contact_interaction(request, contact_id):
     """Add an interaction to a contact."""
     contact = get_object_or_404(Contact, id=contact_id, organizer=request.user)
     
-    interaction_type = request.data.get('interaction_type', 'manual_entry')
-    description = request.data.get('description', '')
-    metadata = request.data.get('metadata', {})
+    # Validate up front: a buffered entry is only inserted later, by the flush
+    serializer = ContactInteractionCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    interaction = ContactInteraction.objects.create(
+    idempotency_key = request.headers.get('Idempotency-Key')
+    max_key_length = ContactInteraction._meta.get_field('idempotency_key').max_length
+    if idempotency_key and len(idempotency_key) > max_key_length:
+        return Response(
+            {'error': f"Idempotency-Key must be at most {max_key_length} characters"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    interaction = record_interaction(
         contact=contact,
         organizer=request.user,
-        interaction_type=interaction_type,
-        description=description,
-        metadata=metadata
+        idempotency_key=idempotency_key,
+        **serializer.validated_data
     )
     
     serializer = ContactInteractionSerializer(interaction)
-    return Response(serializer.data, status=status.HTTP_201_CREATED)
+    # Buffered interactions are accepted now and stored by the next flush
+    response_status = status.HTTP_202_ACCEPTED if buffering_enabled() else status.HTTP_201_CREATED
+    return Response(serializer.data, status=response_status)
 
 
 @api_view(['POST'])
@@ -235,11 +554,17 @@ def import_contacts(request):
         skip_duplicates = serializer.validated_data['skip_duplicates']
         update_existing = serializer.validated_data['update_existing']
         
+        # Spool the upload to storage in chunks and hand the task only its path
+        file_path = default_storage.save(
+            f"{settings.CONTACTS_IMPORT_SPOOL_PATH}/{request.user.id}/{uuid.uuid4().hex}.csv",
+            csv_file
+        )
+        
         # Process CSV import
         from .tasks import process_contact_import
         task = process_contact_import.delay(
             organizer_id=request.user.id,
-            csv_content=csv_file.read().decode('utf-8'),
+            file_path=file_path,
             skip_duplicates=skip_duplicates,
             update_existing=update_existing
         )
@@ -256,35 +581,21 @@ def import_contacts(request):
 @permission_classes([CanViewContacts])
 def export_contacts(request):
     """Export contacts to CSV."""
-    from django.http import HttpResponse
-    import csv
+    from django.http import FileResponse
     
-    contacts = Contact.objects.filter(organizer=request.user)
+    # Identical concurrent exports share one spooled file, reused until the next write
+    version, _ = get_organizer_version(request.user.id)
+    path = CONTACTS_EXPORT.get(request.user.id, version)
+    if not private_storage.exists(path):
+        # Expired since its path was cached
+        path = CONTACTS_EXPORT.refresh((request.user.id, version))
     
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="contacts.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'First Name', 'Last Name', 'Email', 'Phone', 'Company',
-        'Job Title', 'Notes', 'Tags', 'Total Bookings', 'Last Booking Date'
-    ])
-    
-    for contact in contacts:
-        writer.writerow([
-            contact.first_name,
-            contact.last_name,
-            contact.email,
-            contact.phone,
-            contact.company,
-            contact.job_title,
-            contact.notes,
-            ','.join(contact.tags) if contact.tags else '',
-            contact.total_bookings,
-            contact.last_booking_date.strftime('%Y-%m-%d') if contact.last_booking_date else ''
-        ])
-    
-    return response
+    return FileResponse(
+        private_storage.open(path, 'rb'),
+        as_attachment=True,
+        filename='contacts.csv',
+        content_type='text/csv'
+    )
 
 
 @api_view(['POST'])
@@ -217,7 +217,7 @@ const ContactGroups: React.FC = () => {
                       </Typography>
                     )}
 
-                    {group.contacts.length > 0 && (
+                    {group.contacts && group.contacts.length > 0 && (
                       <Box display="flex" alignItems="center" gap={1}>
                         <AvatarGroup max={4} sx={{ '& .MuiAvatar-root': { width: 24, height: 24, fontSize: '0.75rem' } }}>
                           {group.contacts.slice(0, 4).map((contact) => (
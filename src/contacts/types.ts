@@ -24,7 +24,9 @@ export interface ContactGroup {
   description: string;
   color: string;
   contact_count: number;
-  contacts: Contact[];
+  rules: Record<string, unknown> | null; // Smart groups derive membership from rules
+  is_smart: boolean;
+  contacts?: Contact[]; // Only on group detail; list members via /contacts/groups/:id/contacts/
   created_at: string;
   updated_at: string;
 }